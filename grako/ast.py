@@ -4,21 +4,45 @@
 """
 Define the AST class, a direct descendant of dict that's used during parsing
 to store the values of named elements of grammar rules.
+
+While parsing, changes to an AST are journaled so that the changes made by
+a failed option can be rolled back without copying the AST on every try.
 """
 from __future__ import absolute_import, division, print_function, unicode_literals
 
-from grako.util import strtype, asjson, is_list, PY3, Mapping
+import sys
+from collections import OrderedDict
+
+from grako.util import strtype, asjson, is_list, Mapping
+
+
+# dicts keep insertion order since Python 3.7
+_dict = dict if sys.version_info >= (3, 7) else OrderedDict
+
+# the kinds of changes in the journal of an AST
+_NEW = 'new'
+_APPEND = 'append'
+_REPLACE = 'replace'
+_DELETE = 'delete'
+_MISSING = object()
+
+# the keys that don't clash with attributes, by AST class and key
+_SAFEKEYS = {}
+
+# sets the slots of an AST without the check in AST.__setattr__()
+_setslot = object.__setattr__
 
 
-class AST(dict):
-    _closed = False
+class AST(_dict):
+    __slots__ = ('_journal', '_marks')
 
     def __init__(self, *args, **kwargs):
         super(AST, self).__init__()
-        self._order = []
+        _setslot(self, '_journal', None)
+        _setslot(self, '_marks', 0)
 
-        self.update(*args, **kwargs)
-        self._closed = True
+        if args or kwargs:
+            self.update(*args, **kwargs)
 
     def set_parseinfo(self, value):
         self.set('parseinfo', value)
@@ -29,24 +53,12 @@ class AST(dict):
     def iterkeys(self):
         return iter(self)
 
-    def keys(self):
-        keys = self.iterkeys()
-        return keys if PY3 else list(keys)
-
     def itervalues(self):
         return (self[k] for k in self)
 
-    def values(self):
-        values = self.itervalues()
-        return values if PY3 else list(values)
-
     def iteritems(self):
         return ((k, self[k]) for k in self)
 
-    def items(self):
-        items = self.iteritems()
-        return items if PY3 else list(items)
-
     def update(self, *args, **kwargs):
         def upairs(d):
             for k, v in d:
@@ -64,14 +76,17 @@ class AST(dict):
 
         previous = self.get(key, None)
         if previous is None:
+            if self._journal is not None:
+                self._log(_NEW, key, previous if key in self else _MISSING)
             if force_list:
                 super(AST, self).__setitem__(key, [value])
             else:
                 super(AST, self).__setitem__(key, value)
-            self._order.append(key)
         elif is_list(previous):
+            self._log(_APPEND, key)
             previous.append(value)
         else:
+            self._log(_REPLACE, key, previous)
             super(AST, self).__setitem__(key, [previous, value])
         return self
 
@@ -84,9 +99,6 @@ class AST(dict):
             for k, v in self.items()
         )
 
-    def __iter__(self):
-        return iter(self._order)
-
     def __getitem__(self, key):
         if key in self:
             return super(AST, self).__getitem__(key)
@@ -99,11 +111,12 @@ class AST(dict):
 
     def __delitem__(self, key):
         key = self._safekey(key)
+        if self._journal is not None:
+            self._log(_DELETE, key, (list(self).index(key), self[key]))
         super(AST, self).__delitem__(key)
-        self._order.remove(key)
 
     def __setattr__(self, name, value):
-        if self._closed and name not in vars(self):
+        if name not in AST.__slots__:
             raise AttributeError(
                 '%s attributes are fixed. Cannot set attribute %s.'
                 %
@@ -127,9 +140,16 @@ class AST(dict):
         return (AST, (), None, None, iter(self.items()))
 
     def _safekey(self, key):
-        while self.__hasattribute__(key):
-            key += '_'
-        return key
+        if not isinstance(key, strtype):
+            return key
+        cachekey = (type(self), key)
+        safekey = _SAFEKEYS.get(cachekey)
+        if safekey is None:
+            safekey = key
+            while self.__hasattribute__(safekey):
+                safekey += '_'
+            _SAFEKEYS[cachekey] = safekey
+        return safekey
 
     def _define(self, keys, list_keys=None):
         # WARNING: This is the *only* implementation that does what's intended
@@ -141,8 +161,58 @@ class AST(dict):
         for key in keys:
             key = self._safekey(key)
             if key not in self:
+                self._log(_NEW, key, _MISSING)
                 super(AST, self).__setitem__(key, None)
-                self._order.append(key)
+
+    def _log(self, change, key, previous=None):
+        if self._journal is not None:
+            self._journal.append((change, key, previous))
+
+    def _mark(self):
+        """
+        Start journaling changes, and return a mark to roll back to.
+        Every mark must be released with `_release()` or `_rollback()`.
+        """
+        journal = self._journal
+        if journal is None:
+            journal = []
+            _setslot(self, '_journal', journal)
+        _setslot(self, '_marks', self._marks + 1)
+        return len(journal)
+
+    def _release(self, mark):
+        """ Keep the changes made since `mark`. """
+        marks = self._marks - 1
+        _setslot(self, '_marks', marks)
+        if not marks:
+            _setslot(self, '_journal', None)
+
+    def _rollback(self, mark):
+        """ Undo the changes made since `mark`, latest first. """
+        journal = self._journal
+        setitem = super(AST, self).__setitem__
+        while len(journal) > mark:
+            change, key, previous = journal.pop()
+            if change is _NEW:
+                if previous is _MISSING:
+                    super(AST, self).__delitem__(key)
+                else:
+                    setitem(key, previous)
+            elif change is _APPEND:
+                super(AST, self).__getitem__(key).pop()
+            elif change is _REPLACE:
+                setitem(key, previous)
+            else:
+                self._reinsert(key, *previous)
+        self._release(mark)
+
+    def _reinsert(self, key, index, value):
+        following = [(k, super(AST, self).__getitem__(k)) for k in list(self)[index:]]
+        for k, _ in following:
+            super(AST, self).__delitem__(k)
+        super(AST, self).__setitem__(key, value)
+        for k, v in following:
+            super(AST, self).__setitem__(k, v)
 
     def __json__(self):
         return {
@@ -0,0 +1,10 @@
+# -*- coding: utf-8 -*-
+# Copyright (C) 2017      by Juancarlo Añez
+# Copyright (C) 2012-2016 by Juancarlo Añez and Thomas Bragg
+"""
+Performance benchmarks for the parsing engine.
+
+    python -m grako.bench                   # the suite over all corpora
+    python -m grako.bench.left_recursion    # time per term as inputs grow
+"""
+from __future__ import absolute_import, division, print_function, unicode_literals
@@ -0,0 +1,123 @@
+# -*- coding: utf-8 -*-
+# Copyright (C) 2017      by Juancarlo Añez
+# Copyright (C) 2012-2016 by Juancarlo Añez and Thomas Bragg
+"""
+The grammars and inputs of the benchmarks.
+
+The inputs are synthesized from a fixed seed, so every run parses the
+same text for the same scale. Grammars are read from the source tree
+(`etc/`, `examples/`, `grammar/`), and a corpus whose grammar is not
+available, as in an installed package, is skipped.
+"""
+from __future__ import absolute_import, division, print_function, unicode_literals
+
+import io
+import os
+import random
+from collections import namedtuple
+
+from grako.bench import left_recursion
+
+
+ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+class Corpus(namedtuple('_Corpus', ['name', 'grammar', 'start', 'generate', 'size'])):
+    """
+    A benchmark input: `grammar` is the grammar text, or the path to it
+    from the root of the source tree, and `generate(size, seed)` builds
+    the text to parse with `size` scaled by the run.
+    """
+    __slots__ = ()
+
+    def grammar_text(self):
+        if not self.grammar.endswith('.ebnf'):
+            return self.grammar
+        path = os.path.join(ROOT, self.grammar)
+        if not os.path.isfile(path):
+            return None
+        with io.open(path, encoding='utf-8') as f:
+            return f.read()
+
+    def text(self, scale=1.0, seed=0):
+        return self.generate(max(1, int(self.size * scale)), seed)
+
+
+def json_text(values, seed=0):
+    # etc/json.ebnf only accepts strings of one character, and numbers
+    # without exponents
+    rnd = random.Random(seed)
+    chars = 'abcdefghijklmnopqrstuvwxyz0123456789'
+
+    def string():
+        return '"%s"' % rnd.choice(chars)
+
+    def number():
+        if rnd.random() < 0.5:
+            return str(rnd.randint(-999, 99999))
+        return '%d.%d' % (rnd.randint(0, 999), rnd.randint(0, 99))
+
+    def value(depth):
+        p = rnd.random()
+        if depth < 4 and p < 0.15:
+            return obj(depth + 1, rnd.randint(1, 6))
+        elif depth < 4 and p < 0.3:
+            return '[%s]' % ', '.join(value(depth + 1) for _ in range(rnd.randint(0, 8)))
+        elif p < 0.6:
+            return string()
+        elif p < 0.9:
+            return number()
+        return rnd.choice(['true', 'false', 'null'])
+
+    def obj(depth, n):
+        pairs = ('%s: %s' % (string(), value(depth)) for _ in range(n))
+        return '{%s}' % ',\n'.join(pairs)
+
+    return obj(0, values)
+
+
+def calc_text(terms, seed=0):
+    return left_recursion.expression(terms, seed=seed)
+
+
+def regex_text(atoms, seed=0):
+    rnd = random.Random(seed)
+
+    def term(depth):
+        p = rnd.random()
+        if depth < 3 and p < 0.15:
+            atom = '(%s)' % choice(depth + 1, rnd.randint(1, 3))
+        else:
+            atom = ''.join(rnd.choice('abcdefgh') for _ in range(rnd.randint(1, 4)))
+        if rnd.random() < 0.3:
+            atom += '*'
+        return atom
+
+    def sequence(depth, n):
+        return ''.join(term(depth) for _ in range(n))
+
+    def choice(depth, n):
+        return '|'.join(sequence(depth, rnd.randint(1, 4)) for _ in range(n))
+
+    return choice(0, atoms)
+
+
+def ebnf_text(copies, seed=0):
+    # the bootstrap grammar parsing itself; without semantics, rules
+    # may be defined more than once
+    grammar = CORPORA['bootstrap'].grammar_text()
+    i = grammar.index('\nstart\n')
+    return grammar[:i] + copies * grammar[i:]
+
+
+CORPORA = dict(
+    (corpus.name, corpus)
+    for corpus in [
+        Corpus('json', 'etc/json.ebnf', 'start', json_text, 500),
+        Corpus('calc', 'examples/calc/v1/calc.ebnf', 'start', calc_text, 400),
+        Corpus('calc_ast', 'examples/calc/v4/calc.ebnf', 'start', calc_text, 400),
+        Corpus('regex', 'examples/regex/regex.ebnf', 'START', regex_text, 300),
+        Corpus('bootstrap', 'grammar/grako.ebnf', 'start', ebnf_text, 4),
+        Corpus('left_recursion', left_recursion.GRAMMAR, 'start', calc_text, 4000),
+    ]
+)
@@ -0,0 +1,91 @@
+# -*- coding: utf-8 -*-
+# Copyright (C) 2017      by Juancarlo Añez
+# Copyright (C) 2012-2016 by Juancarlo Añez and Thomas Bragg
+"""
+Time the parsing of left-associative expressions of increasing length
+with a left-recursive grammar. The time per term should stay constant
+as the expressions grow.
+
+    python -m grako.bench.left_recursion [--sizes 1000,2000,4000] [--repeat 3]
+"""
+from __future__ import absolute_import, division, print_function, unicode_literals
+
+import argparse
+import random
+import sys
+import timeit
+
+from grako.tool import compile
+
+
+GRAMMAR = r'''
+    @@left_recursion :: True
+
+    start = expression $ ;
+
+    expression
+        =
+        | expression '+' term
+        | expression '-' term
+        | term
+        ;
+
+    term
+        =
+        | term '*' factor
+        | term '/' factor
+        | factor
+        ;
+
+    factor
+        =
+        | '(' expression ')'
+        | number
+        ;
+
+    number = /\d+/ ;
+'''
+
+SIZES = (1000, 2000, 4000, 8000, 16000)
+
+
+def expression(terms, seed=0):
+    rnd = random.Random(seed)
+    parts = [str(rnd.randint(0, 999))]
+    for _ in range(terms - 1):
+        parts.append(rnd.choice('+-*/'))
+        if rnd.random() < 0.1:
+            parts.append('(%d + %d)' % (rnd.randint(0, 99), rnd.randint(0, 99)))
+        else:
+            parts.append(str(rnd.randint(0, 999)))
+    return ' '.join(parts)
+
+
+def run(sizes=SIZES, repeat=3, out=sys.stdout):
+    model = compile(GRAMMAR, 'LeftRecursion')
+    print('%8s %10s %12s %14s' % ('terms', 'bytes', 'seconds', 'usec/term'), file=out)
+    results = []
+    for terms in sizes:
+        text = expression(terms)
+        seconds = min(timeit.repeat(lambda: model.parse(text), number=1, repeat=repeat))
+        results.append((terms, len(text), seconds))
+        print('%8d %10d %12.4f %14.2f' % (terms, len(text), seconds, 1e6 * seconds / terms), file=out)
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument(
+        '--sizes',
+        default=','.join(str(n) for n in SIZES),
+        help='comma separated numbers of terms in the expressions',
+    )
+    parser.add_argument('--repeat', type=int, default=3, help='runs per size, the best is reported')
+    args = parser.parse_args(argv)
+
+    sys.setrecursionlimit(max(sys.getrecursionlimit(), 100000))
+    run(sizes=[int(n) for n in args.sizes.split(',')], repeat=args.repeat)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,171 @@
+# -*- coding: utf-8 -*-
+# Copyright (C) 2017      by Juancarlo Añez
+# Copyright (C) 2012-2016 by Juancarlo Añez and Thomas Bragg
+"""
+Measure the throughput, peak memory, and memoization statistics of
+parsing each corpus with the grammar model (`Grammar.parse`) and with
+the parser generated from it.
+
+    python -m grako.bench [--corpus NAME] [--engine ENGINE] [--scale 1.0]
+                          [--repeat 3] [--json RESULTS] [--baseline RESULTS]
+
+The results can be written as JSON, and compared with those of a
+previous run, to find regressions.
+"""
+from __future__ import absolute_import, division, print_function, unicode_literals
+
+import argparse
+import json
+import platform
+import sys
+import timeit
+
+from grako._config import __version__
+from grako.bench.corpora import CORPORA
+from grako.codegen import codegen
+from grako.grammars import ModelContext
+from grako.parsing import Parser
+from grako.tool import compile
+from grako.util import builtins
+
+try:
+    import tracemalloc
+except ImportError:
+    tracemalloc = None
+
+
+ENGINES = ('model', 'generated')
+
+
+def generated_parser(model):
+    code = codegen(model)
+    module = {}
+    exec(builtins.compile(code, model.name, 'exec'), module)
+    return next(
+        value for value in module.values()
+        if isinstance(value, type) and issubclass(value, Parser) and value is not Parser
+    )
+
+
+def peak_memory(parse):
+    if tracemalloc is None:
+        return None
+    tracemalloc.start()
+    try:
+        parse()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def measure(corpus, engine, model, text, repeat=3):
+    if engine == 'model':
+        context = ModelContext(model.rules, keywords=model.keywords)
+
+        def parse():
+            model.parse(text, start=corpus.start, context=context)
+    else:
+        context = generated_parser(model)()
+
+        def parse():
+            context.parse(text, rule_name=corpus.start)
+
+    seconds = min(timeit.repeat(parse, number=1, repeat=repeat))
+    return dict(
+        corpus=corpus.name,
+        engine=engine,
+        bytes=len(text),
+        seconds=seconds,
+        throughput=len(text) / seconds,
+        peak_memory=peak_memory(parse),
+        memo=context.memo_stats,
+    )
+
+
+def run(corpora=None, engines=ENGINES, scale=1.0, repeat=3, baseline=None, out=sys.stdout):
+    baseline = {(r['corpus'], r['engine']): r for r in (baseline or [])}
+
+    print(
+        '%-16s %-10s %10s %10s %12s %12s %10s %10s'
+        %
+        ('corpus', 'engine', 'bytes', 'seconds', 'bytes/s', 'peak', 'memo', 'baseline'),
+        file=out
+    )
+    results = []
+    for name in corpora or sorted(CORPORA):
+        corpus = CORPORA[name]
+        grammar = corpus.grammar_text()
+        if grammar is None:
+            print('%-16s skipped, %s not found' % (name, corpus.grammar), file=out)
+            continue
+        model = compile(grammar, name)
+        text = corpus.text(scale)
+        for engine in engines:
+            result = measure(corpus, engine, model, text, repeat=repeat)
+            results.append(result)
+
+            previous = baseline.get((name, engine))
+            ratio = '%10.2f' % (result['throughput'] / previous['throughput']) if previous else ''
+            print(
+                '%-16s %-10s %10d %10.4f %12.0f %12s %10d %s'
+                %
+                (
+                    name, engine, result['bytes'], result['seconds'],
+                    result['throughput'], result['peak_memory'],
+                    result['memo']['peak'], ratio,
+                ),
+                file=out
+            )
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument(
+        '--corpus',
+        action='append',
+        choices=sorted(CORPORA),
+        help='a corpus to parse, all of them by default',
+    )
+    parser.add_argument(
+        '--engine',
+        action='append',
+        choices=ENGINES,
+        help='parse with the model or the generated parser, both by default',
+    )
+    parser.add_argument('--scale', type=float, default=1.0, help='a factor for the size of the inputs')
+    parser.add_argument('--repeat', type=int, default=3, help='runs per input, the best is reported')
+    parser.add_argument('--json', metavar='RESULTS', help='write the results as JSON to RESULTS')
+    parser.add_argument('--baseline', metavar='RESULTS', help='compare the throughput with that in RESULTS')
+    args = parser.parse_args(argv)
+
+    baseline = None
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)['results']
+
+    # the expression grammars are right recursive
+    sys.setrecursionlimit(max(sys.getrecursionlimit(), 100000))
+    results = run(
+        corpora=args.corpus,
+        engines=args.engine or ENGINES,
+        scale=args.scale,
+        repeat=args.repeat,
+        baseline=baseline,
+    )
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(
+                dict(
+                    grako=__version__,
+                    python=platform.python_version(),
+                    implementation=platform.python_implementation(),
+                    scale=args.scale,
+                    repeat=args.repeat,
+                    results=results,
+                ),
+                f,
+                indent=2,
+                sort_keys=True,
+            )
@@ -14,12 +14,25 @@
 from __future__ import print_function, division, absolute_import, unicode_literals
 
 from grako.buffering import Buffer
-from grako.parsing import graken, Parser
+from grako.parsing import graken, nomemo, Parser  # noqa
 from grako.util import re, RE_FLAGS, generic_main  # noqa
 
 
 KEYWORDS = {}
 
+PATTERN_0 = re.compile(r'.*?(?!\)\?)', RE_FLAGS)
+PATTERN_1 = re.compile(r'`', RE_FLAGS)
+PATTERN_2 = re.compile(r'([^"\n]|\\"|\\\\)*', RE_FLAGS)
+PATTERN_3 = re.compile(r"([^'\n]|\\'|\\\\)*", RE_FLAGS)
+PATTERN_4 = re.compile(r'0[xX](\d|[a-fA-F])+', RE_FLAGS)
+PATTERN_5 = re.compile(r'[-+]?(?:\d+\.\d*|\d*\.\d+)(?:[Ee][-+]?\d+)?', RE_FLAGS)
+PATTERN_6 = re.compile(r'[-+]?\d+', RE_FLAGS)
+PATTERN_7 = re.compile(r'(?!\d)\w+(::(?!\d)\w+)+', RE_FLAGS)
+PATTERN_8 = re.compile(r'(?!\d)\w+', RE_FLAGS)
+PATTERN_9 = re.compile(r'([^/\\]|\\/|\\.)+', RE_FLAGS)
+PATTERN_10 = re.compile(r'(.|\n)+?(?=/\?)', RE_FLAGS)
+PATTERN_11 = re.compile(r'/\?+', RE_FLAGS)
+
 
 class EBNFBootstrapBuffer(Buffer):
     def __init__(
@@ -46,6 +59,8 @@ class EBNFBootstrapBuffer(Buffer):
 
 
 class EBNFBootstrapParser(Parser):
+    left_recursive_rules = frozenset([])
+
     def __init__(
         self,
         whitespace=None,
@@ -98,8 +113,8 @@ class EBNFBootstrapParser(Parser):
         self.name_last_node('rules')
         self._check_eof()
         self.ast._define(
-            ['directives', 'keywords', 'rules', 'title'],
-            []
+            ('directives', 'keywords', 'rules', 'title'),
+            ()
         )
 
     @graken()
@@ -110,70 +125,78 @@ class EBNFBootstrapParser(Parser):
         self._cut()
         with self._group():
             with self._choice():
-                with self._option():
-                    with self._group():
-                        with self._choice():
-                            with self._option():
-                                self._token('comments')
-                            with self._option():
-                                self._token('eol_comments')
-                            with self._option():
-                                self._token('whitespace')
-                            self._error('expecting one of: comments eol_comments whitespace')
-                    self.name_last_node('name')
-                    self._cut()
-                    self._cut()
-                    self._token('::')
-                    self._cut()
-                    self._regex_()
-                    self.name_last_node('value')
-                with self._option():
-                    with self._group():
-                        with self._choice():
-                            with self._option():
-                                self._token('nameguard')
-                            with self._option():
-                                self._token('ignorecase')
-                            with self._option():
-                                self._token('left_recursion')
-                            with self._option():
-                                self._token('parseinfo')
-                            self._error('expecting one of: ignorecase left_recursion nameguard parseinfo')
-                    self.name_last_node('name')
-                    self._cut()
-                    with self._group():
-                        with self._choice():
-                            with self._option():
-                                self._token('::')
-                                self._cut()
-                                self._boolean_()
-                                self.name_last_node('value')
-                            with self._option():
-                                self._constant('True')
-                                self.name_last_node('value')
-                            self._error('no available options')
-                with self._option():
-                    with self._group():
-                        self._token('grammar')
-                    self.name_last_node('name')
-                    self._cut()
-                    self._token('::')
-                    self._cut()
-                    self._word_()
-                    self.name_last_node('value')
-                with self._option():
-                    with self._group():
-                        self._token('namechars')
-                    self.name_last_node('name')
-                    self._cut()
-                    self._token('::')
-                    self._cut()
-                    self._string_()
-                    self.name_last_node('value')
-                self._error('no available options')
+                c13, t13 = self._lookahead_char()
+                if c13 in {'c', 'e', 'w'}:
+                    with self._option():
+                        with self._group():
+                            self._token_choice(('comments', 'eol_comments', 'whitespace'), 'expecting one of: comments eol_comments whitespace')
+                        self.name_last_node('name')
+                        self._cut()
+                        self._cut()
+                        self._token('::')
+                        self._cut()
+                        self._regex_()
+                        self.name_last_node('value')
+                if c13 in {'i', 'l', 'n', 'p'}:
+                    with self._option():
+                        with self._group():
+                            self._token_choice(('nameguard', 'ignorecase', 'left_recursion', 'parseinfo'), 'expecting one of: ignorecase left_recursion nameguard parseinfo')
+                        self.name_last_node('name')
+                        self._cut()
+                        with self._group():
+                            with self._choice():
+                                with self._option():
+                                    self._token('::')
+                                    self._cut()
+                                    self._boolean_()
+                                    self.name_last_node('value')
+                                with self._option():
+                                    self._constant('True')
+                                    self.name_last_node('value')
+                                self._error('no available options')
+                if c13 in {'g'}:
+                    with self._option():
+                        with self._group():
+                            self._token('grammar')
+                        self.name_last_node('name')
+                        self._cut()
+                        self._token('::')
+                        self._cut()
+                        self._word_()
+                        self.name_last_node('value')
+                if c13 in {'m'}:
+                    with self._option():
+                        with self._group():
+                            self._token('memoize')
+                        self.name_last_node('name')
+                        self._cut()
+                        self._token('::')
+                        self._cut()
+                        with self._group():
+                            with self._choice():
+                                c10, t10 = self._lookahead_char()
+                                if c10 in {'a'}:
+                                    with self._option():
+                                        self._token('auto')
+                                if t10 or c10 in {'F', 'T', 'f', 't'}:
+                                    with self._option():
+                                        self._boolean_()
+                                self._error('expecting one of: auto')
+                        self.name_last_node('value')
+                if c13 in {'n'}:
+                    with self._option():
+                        with self._group():
+                            self._token('namechars')
+                        self.name_last_node('name')
+                        self._cut()
+                        self._token('::')
+                        self._cut()
+                        self._string_()
+                        self.name_last_node('value')
+                self._error('expecting one of: memoize')
         self.ast._define(
-            ['name', 'value'],
-            []
+            ('name', 'value'),
+            ()
         )
 
     @graken()
@@ -190,66 +213,21 @@ class EBNFBootstrapParser(Parser):
                 self.add_last_node_to_name('@')
                 with self._ifnot():
                     with self._group():
-                        with self._choice():
-                            with self._option():
-                                self._token(':')
-                            with self._option():
-                                self._token('=')
-                            self._error('expecting one of: : =')
+                        self._token_choice((':', '='), 'expecting one of: : =')
             self._closure(block1)
         self._closure(block0)
 
     @graken()
     def _paramdef_(self):
         with self._choice():
-            with self._option():
-                self._token('::')
-                self._cut()
-                self._params_()
-                self.name_last_node('params')
-            with self._option():
-                self._token('(')
-                self._cut()
-                with self._group():
-                    with self._choice():
-                        with self._option():
-                            self._kwparams_()
-                            self.name_last_node('kwparams')
-                        with self._option():
-                            self._params_()
-                            self.name_last_node('params')
-                            self._token(',')
-                            self._cut()
-                            self._kwparams_()
-                            self.name_last_node('kwparams')
-                        with self._option():
-                            self._params_()
-                            self.name_last_node('params')
-                        self._error('no available options')
-                self._token(')')
-            self._error('no available options')
-        self.ast._define(
-            ['kwparams', 'params'],
-            []
-        )
-
-    @graken('Rule')
-    def _rule_(self):
-
-        def block1():
-            self._decorator_()
-        self._closure(block1)
-        self.name_last_node('decorators')
-        self._name_()
-        self.name_last_node('name')
-        self._cut()
-        with self._optional():
-            with self._choice():
+            c6, t6 = self._lookahead_char()
+            if c6 in {':'}:
                 with self._option():
                     self._token('::')
                     self._cut()
                     self._params_()
                     self.name_last_node('params')
+            if c6 in {'('}:
                 with self._option():
                     self._token('(')
                     self._cut()
@@ -270,6 +248,52 @@ class EBNFBootstrapParser(Parser):
                                 self.name_last_node('params')
                             self._error('no available options')
                     self._token(')')
+            self._error('no available options')
+        self.ast._define(
+            ('kwparams', 'params'),
+            ()
+        )
+
+    @graken('Rule')
+    def _rule_(self):
+
+        def block1():
+            self._decorator_()
+        self._closure(block1)
+        self.name_last_node('decorators')
+        self._name_()
+        self.name_last_node('name')
+        self._cut()
+        with self._optional():
+            with self._choice():
+                c9, t9 = self._lookahead_char()
+                if c9 in {':'}:
+                    with self._option():
+                        self._token('::')
+                        self._cut()
+                        self._params_()
+                        self.name_last_node('params')
+                if c9 in {'('}:
+                    with self._option():
+                        self._token('(')
+                        self._cut()
+                        with self._group():
+                            with self._choice():
+                                with self._option():
+                                    self._kwparams_()
+                                    self.name_last_node('kwparams')
+                                with self._option():
+                                    self._params_()
+                                    self.name_last_node('params')
+                                    self._token(',')
+                                    self._cut()
+                                    self._kwparams_()
+                                    self.name_last_node('kwparams')
+                                with self._option():
+                                    self._params_()
+                                    self.name_last_node('params')
+                                self._error('no available options')
+                        self._token(')')
                 self._error('no available options')
         with self._optional():
             self._token('<')
@@ -283,8 +307,8 @@ class EBNFBootstrapParser(Parser):
         self._token(';')
         self._cut()
         self.ast._define(
-            ['base', 'decorators', 'exp', 'kwparams', 'name', 'params'],
-            []
+            ('base', 'decorators', 'exp', 'kwparams', 'name', 'params'),
+            ()
         )
 
     @graken()
@@ -292,12 +316,7 @@ class EBNFBootstrapParser(Parser):
         self._token('@')
         self._cut()
         with self._group():
-            with self._choice():
-                with self._option():
-                    self._token('override')
-                with self._option():
-                    self._token('name')
-                self._error('expecting one of: name override')
+            self._token_choice(('override', 'name', 'nomemo'), 'expecting one of: name nomemo override')
         self.name_last_node('@')
 
     @graken()
@@ -374,19 +393,22 @@ class EBNFBootstrapParser(Parser):
         self._positive_closure(block1)
         self.name_last_node('sequence')
         self.ast._define(
-            ['sequence'],
-            []
+            ('sequence',),
+            ()
         )
 
     @graken()
     def _element_(self):
         with self._choice():
-            with self._option():
-                self._rule_include_()
+            c0, t0 = self._lookahead_char()
+            if t0 or c0 in {'>'}:
+                with self._option():
+                    self._rule_include_()
             with self._option():
                 self._named_()
-            with self._option():
-                self._override_()
+            if t0 or c0 in {'@'}:
+                with self._option():
+                    self._override_()
             with self._option():
                 self._term_()
             self._error('no available options')
@@ -416,8 +438,8 @@ class EBNFBootstrapParser(Parser):
         self._term_()
         self.name_last_node('exp')
         self.ast._define(
-            ['exp', 'name'],
-            []
+            ('exp', 'name'),
+            ()
         )
 
     @graken('Named')
@@ -429,19 +451,23 @@ class EBNFBootstrapParser(Parser):
         self._term_()
         self.name_last_node('exp')
         self.ast._define(
-            ['exp', 'name'],
-            []
+            ('exp', 'name'),
+            ()
         )
 
     @graken()
     def _override_(self):
         with self._choice():
-            with self._option():
-                self._override_list_()
-            with self._option():
-                self._override_single_()
-            with self._option():
-                self._override_single_deprecated_()
+            c0, t0 = self._lookahead_char()
+            if t0 or c0 in {'@'}:
+                with self._option():
+                    self._override_list_()
+            if t0 or c0 in {'@'}:
+                with self._option():
+                    self._override_single_()
+            if t0 or c0 in {'@'}:
+                with self._option():
+                    self._override_single_deprecated_()
             self._error('no available options')
 
     @graken('OverrideList')
@@ -468,8 +494,10 @@ class EBNFBootstrapParser(Parser):
     @graken()
     def _term_(self):
         with self._choice():
-            with self._option():
-                self._void_()
+            c0, t0 = self._lookahead_char()
+            if t0 or c0 in {'('}:
+                with self._option():
+                    self._void_()
             with self._option():
                 self._gather_()
             with self._option():
@@ -478,22 +506,30 @@ class EBNFBootstrapParser(Parser):
                 self._left_join_()
             with self._option():
                 self._right_join_()
-            with self._option():
-                self._group_()
-            with self._option():
-                self._empty_closure_()
-            with self._option():
-                self._positive_closure_()
-            with self._option():
-                self._closure_()
-            with self._option():
-                self._optional_()
-            with self._option():
-                self._special_()
-            with self._option():
-                self._kif_()
-            with self._option():
-                self._knot_()
+            if t0 or c0 in {'('}:
+                with self._option():
+                    self._group_()
+            if t0 or c0 in {'{'}:
+                with self._option():
+                    self._empty_closure_()
+            if t0 or c0 in {'{'}:
+                with self._option():
+                    self._positive_closure_()
+            if t0 or c0 in {'{'}:
+                with self._option():
+                    self._closure_()
+            if t0 or c0 in {'['}:
+                with self._option():
+                    self._optional_()
+            if t0 or c0 in {'?'}:
+                with self._option():
+                    self._special_()
+            if t0 or c0 in {'&'}:
+                with self._option():
+                    self._kif_()
+            if t0 or c0 in {'!'}:
+                with self._option():
+                    self._knot_()
             with self._option():
                 self._atom_()
             self._error('no available options')
@@ -507,8 +543,8 @@ class EBNFBootstrapParser(Parser):
         self._token(')')
         self._cut()
         self.ast._define(
-            ['exp'],
-            []
+            ('exp',),
+            ()
         )
 
     @graken()
@@ -535,16 +571,11 @@ class EBNFBootstrapParser(Parser):
         self.name_last_node('exp')
         self._token('}')
         with self._group():
-            with self._choice():
-                with self._option():
-                    self._token('+')
-                with self._option():
-                    self._token('-')
-                self._error('expecting one of: + -')
+            self._token_choice(('+', '-'), 'expecting one of: + -')
         self._cut()
         self.ast._define(
-            ['exp', 'sep'],
-            []
+            ('exp', 'sep'),
+            ()
         )
 
     @graken('Gather')
@@ -561,8 +592,8 @@ class EBNFBootstrapParser(Parser):
             self._cut()
         self._cut()
         self.ast._define(
-            ['exp', 'sep'],
-            []
+            ('exp', 'sep'),
+            ()
         )
 
     @graken()
@@ -589,16 +620,11 @@ class EBNFBootstrapParser(Parser):
         self.name_last_node('exp')
         self._token('}')
         with self._group():
-            with self._choice():
-                with self._option():
-                    self._token('+')
-                with self._option():
-                    self._token('-')
-                self._error('expecting one of: + -')
+            self._token_choice(('+', '-'), 'expecting one of: + -')
         self._cut()
         self.ast._define(
-            ['exp', 'sep'],
-            []
+            ('exp', 'sep'),
+            ()
         )
 
     @graken('Join')
@@ -615,8 +641,8 @@ class EBNFBootstrapParser(Parser):
             self._cut()
         self._cut()
         self.ast._define(
-            ['exp', 'sep'],
-            []
+            ('exp', 'sep'),
+            ()
         )
 
     @graken('LeftJoin')
@@ -629,16 +655,11 @@ class EBNFBootstrapParser(Parser):
         self.name_last_node('exp')
         self._token('}')
         with self._group():
-            with self._choice():
-                with self._option():
-                    self._token('+')
-                with self._option():
-                    self._token('-')
-                self._error('expecting one of: + -')
+            self._token_choice(('+', '-'), 'expecting one of: + -')
         self._cut()
         self.ast._define(
-            ['exp', 'sep'],
-            []
+            ('exp', 'sep'),
+            ()
         )
 
     @graken('RightJoin')
@@ -651,29 +672,27 @@ class EBNFBootstrapParser(Parser):
         self.name_last_node('exp')
         self._token('}')
         with self._group():
-            with self._choice():
-                with self._option():
-                    self._token('+')
-                with self._option():
-                    self._token('-')
-                self._error('expecting one of: + -')
+            self._token_choice(('+', '-'), 'expecting one of: + -')
         self._cut()
         self.ast._define(
-            ['exp', 'sep'],
-            []
+            ('exp', 'sep'),
+            ()
         )
 
     @graken()
     def _separator_(self):
         with self._choice():
-            with self._option():
-                self._group_()
+            c0, t0 = self._lookahead_char()
+            if t0 or c0 in {'('}:
+                with self._option():
+                    self._group_()
             with self._option():
                 self._token_()
             with self._option():
                 self._constant_()
-            with self._option():
-                self._pattern_()
+            if t0 or c0 in {'/', '?'}:
+                with self._option():
+                    self._pattern_()
             self._error('no available options')
 
     @graken('PositiveClosure')
@@ -683,12 +702,7 @@ class EBNFBootstrapParser(Parser):
         self.name_last_node('@')
         self._token('}')
         with self._group():
-            with self._choice():
-                with self._option():
-                    self._token('-')
-                with self._option():
-                    self._token('+')
-                self._error('expecting one of: + -')
+            self._token_choice(('-', '+'), 'expecting one of: + -')
         self._cut()
 
     @graken('Closure')
@@ -721,7 +735,7 @@ class EBNFBootstrapParser(Parser):
     def _special_(self):
         self._token('?(')
         self._cut()
-        self._pattern(r'.*?(?!\)\?)')
+        self._pattern(PATTERN_0)
         self.name_last_node('@')
         self._token(')?')
         self._cut()
@@ -743,20 +757,25 @@ class EBNFBootstrapParser(Parser):
     @graken()
     def _atom_(self):
         with self._choice():
-            with self._option():
-                self._cut_()
-            with self._option():
-                self._cut_deprecated_()
+            c0, t0 = self._lookahead_char()
+            if t0 or c0 in {'~'}:
+                with self._option():
+                    self._cut_()
+            if t0 or c0 in {'>'}:
+                with self._option():
+                    self._cut_deprecated_()
             with self._option():
                 self._token_()
             with self._option():
                 self._constant_()
             with self._option():
                 self._call_()
-            with self._option():
-                self._pattern_()
-            with self._option():
-                self._eof_()
+            if t0 or c0 in {'/', '?'}:
+                with self._option():
+                    self._pattern_()
+            if t0 or c0 in {'$'}:
+                with self._option():
+                    self._eof_()
             self._error('no available options')
 
     @graken('RuleRef')
@@ -789,11 +808,11 @@ class EBNFBootstrapParser(Parser):
 
     @graken('Constant')
     def _constant_(self):
-        self._pattern(r'`')
+        self._pattern(PATTERN_1)
         self._cut()
         self._literal_()
         self.name_last_node('@')
-        self._pattern(r'`')
+        self._pattern(PATTERN_1)
 
     @graken('Token')
     def _token_(self):
@@ -834,41 +853,44 @@ class EBNFBootstrapParser(Parser):
     @graken()
     def _STRING_(self):
         with self._choice():
-            with self._option():
-                self._token('"')
-                self._cut()
-                self._pattern(r'([^"\n]|\\"|\\\\)*')
-                self.name_last_node('@')
-                self._token('"')
-                self._cut()
-            with self._option():
-                self._token("'")
-                self._cut()
-                self._pattern(r"([^'\n]|\\'|\\\\)*")
-                self.name_last_node('@')
-                self._token("'")
-                self._cut()
+            c2, t2 = self._lookahead_char()
+            if c2 in {'"'}:
+                with self._option():
+                    self._token('"')
+                    self._cut()
+                    self._pattern(PATTERN_2)
+                    self.name_last_node('@')
+                    self._token('"')
+                    self._cut()
+            if c2 in {"'"}:
+                with self._option():
+                    self._token("'")
+                    self._cut()
+                    self._pattern(PATTERN_3)
+                    self.name_last_node('@')
+                    self._token("'")
+                    self._cut()
             self._error('expecting one of: " \'')
 
     @graken()
     def _hex_(self):
-        self._pattern(r'0[xX](\d|[a-fA-F])+')
+        self._pattern(PATTERN_4)
 
     @graken()
     def _float_(self):
-        self._pattern(r'[-+]?(?:\d+\.\d*|\d*\.\d+)(?:[Ee][-+]?\d+)?')
+        self._pattern(PATTERN_5)
 
     @graken()
     def _int_(self):
-        self._pattern(r'[-+]?\d+')
+        self._pattern(PATTERN_6)
 
     @graken()
     def _path_(self):
-        self._pattern(r'(?!\d)\w+(::(?!\d)\w+)+')
+        self._pattern(PATTERN_7)
 
     @graken()
     def _word_(self):
-        self._pattern(r'(?!\d)\w+')
+        self._pattern(PATTERN_8)
 
     @graken('Pattern')
     def _pattern_(self):
@@ -887,34 +909,33 @@ class EBNFBootstrapParser(Parser):
     @graken()
     def _regex_(self):
         with self._choice():
-            with self._option():
-                self._token('/')
-                self._cut()
-                self._pattern(r'([^/\\]|\\/|\\.)+')
-                self.name_last_node('@')
-                self._token('/')
-                self._cut()
-            with self._option():
-                self._token('?/')
-                self._cut()
-                self._pattern(r'(.|\n)+?(?=/\?)')
-                self.name_last_node('@')
-                self._pattern(r'/\?+')
-                self._cut()
-            with self._option():
-                self._token('?')
-                self._STRING_()
-                self.name_last_node('@')
+            c3, t3 = self._lookahead_char()
+            if c3 in {'/'}:
+                with self._option():
+                    self._token('/')
+                    self._cut()
+                    self._pattern(PATTERN_9)
+                    self.name_last_node('@')
+                    self._token('/')
+                    self._cut()
+            if c3 in {'?'}:
+                with self._option():
+                    self._token('?/')
+                    self._cut()
+                    self._pattern(PATTERN_10)
+                    self.name_last_node('@')
+                    self._pattern(PATTERN_11)
+                    self._cut()
+            if c3 in {'?'}:
+                with self._option():
+                    self._token('?')
+                    self._STRING_()
+                    self.name_last_node('@')
             self._error('expecting one of: / ?/')
 
     @graken()
     def _boolean_(self):
-        with self._choice():
-            with self._option():
-                self._token('True')
-            with self._option():
-                self._token('False')
-            self._error('expecting one of: False True')
+        self._token_choice(('True', 'False'), 'expecting one of: False True')
 
     @graken('EOF')
     def _eof_(self):
@@ -11,8 +11,13 @@ about source lines and content.
 from __future__ import (absolute_import, division, print_function,
                         unicode_literals)
 
+import codecs
+import io
 import os
+from array import array
+from bisect import bisect_right
 from itertools import takewhile, repeat
+from mmap import mmap as memory_map, ACCESS_READ
 
 from grako.util import identity, imap, ustr, strtype
 from grako.util import extend_list, contains_sublist
@@ -23,9 +28,107 @@ from grako.infos import PosLine, LineIndexInfo, LineInfo, CommentInfo
 
 RETYPE = type(regexp.compile('.'))
 
+BYTES_WHITESPACE_RE = regexp.compile(br'\s+')
+BYTES_EOL_RE = regexp.compile(br'\r\n|\r|\n')
+NON_ASCII_BYTES_RE = regexp.compile(br'[\x80-\xff]')
+
+# the line boundaries recognized by str.splitlines()
+EOL_RE = regexp.compile('\r\n|[\n\r\x0b\x0c\x1c\x1d\x1e\x85\u2028\u2029]')
+
+# the characters str.isalnum() accepts
+ALNUM_RE_SOURCE = r'[^\W_]'
+
+# the only character str.lower() maps differently depending on context
+CONTEXTUAL_LOWER_CHAR = '\u03a3'
+
+# the anchors affected by MULTILINE, skipping escapes and negated classes
+ANCHOR_RE = regexp.compile(r'\\.|\[\^|[$^]')
+BACKREF_RE = regexp.compile(r'\\[1-9]|\(\?P=')
+
 # for backwards compatibility with existing parsers
 LineIndexEntry = LineIndexInfo
 
+# compiled regexes shared by all buffers, cleared when full as `re` does
+_REGEX_REGISTRY = {}
+_MAXCACHE = 512
+
+
+def compiled_regex(pattern, flags=RE_FLAGS):
+    """
+    Compile `pattern` with `flags` once for all buffers and parses.
+    """
+    key = (pattern, flags)
+    regex = _REGEX_REGISTRY.get(key)
+    if regex is None:
+        if len(_REGEX_REGISTRY) >= _MAXCACHE:
+            _REGEX_REGISTRY.clear()
+        regex = _REGEX_REGISTRY[key] = regexp.compile(pattern, flags)
+    return regex
+
+
+def _regex_source(regex):
+    source = regex.pattern
+    if isinstance(source, bytes):
+        source = source.decode('latin-1')
+    return source
+
+
+# the escapes that can't match a line break
+NO_EOL_ESCAPES = set('dwbBAZ')
+EOL_RE_TOKENS = regexp.compile(r'\\(.)|(\[\^)|(\.)|([\x00-\x1f\x85\u2028\u2029])', regexp.DOTALL)
+INLINE_DOTALL_RE = regexp.compile(r'\(\?[a-zA-Z-]*s')
+
+
+def may_match_eol(regex):
+    """
+    Tell, conservatively, if `regex` may match a line break: it uses
+    an escape that could, a negated class, a dot that matches all
+    characters, or a literal control character.
+    """
+    source = _regex_source(regex)
+    dotall = regex.flags & regexp.DOTALL or INLINE_DOTALL_RE.search(source)
+    for escape, negated, dot, control in EOL_RE_TOKENS.findall(source):
+        if escape and escape.isalnum() and escape not in NO_EOL_ESCAPES:
+            return True
+        elif negated or control or (dot and dotall):
+            return True
+    return False
+
+
+def fuse_skip_regexes(regexes):
+    """
+    Compile a single regex that matches any run of matches of the given
+    regexes, tried in order at each position.
+
+    Returns None when the regexes cannot be combined without changing
+    what they match: their flags differ, they use backreferences, or
+    one of them matches the empty string.
+    """
+    flags = set()
+    multiline = set()
+    sources = []
+    for regex in regexes:
+        source = _regex_source(regex)
+        if BACKREF_RE.search(source) or regex.match(regex.pattern[:0]):
+            return None
+        rflags = regex.flags & ~regexp.UNICODE
+        if any(t in ('^', '$') for t in ANCHOR_RE.findall(source)):
+            multiline.add(rflags & regexp.MULTILINE)
+        flags.add(rflags & ~regexp.MULTILINE)
+        sources.append(regex.pattern)
+    if len(flags) > 1 or len(multiline) > 1:
+        return None
+
+    flags = (flags.pop() if flags else 0) | (multiline.pop() if multiline else 0)
+    if sources and isinstance(sources[0], bytes):
+        fused = b'(?:' + b'|'.join(b'(?:%s)' % s for s in sources) + b')*'
+    else:
+        fused = '(?:' + '|'.join('(?:%s)' % s for s in sources) + ')*'
+    try:
+        return regexp.compile(fused, flags)
+    except regexp.error:
+        return None
+
 
 class Buffer(object):
     def __init__(self,
@@ -38,10 +141,14 @@ class Buffer(object):
                  nameguard=None,
                  comment_recovery=False,
                  namechars='',
+                 skip_cache=False,
                  **kwargs):
-        text = ustr(text)
+        text = self._decode_text(text)
         self.text = self.original_text = text
         self.filename = filename or ''
+        self.skip_cache = skip_cache
+        self._skip_re = None
+        self._skip_positions = {}
 
         self.whitespace = whitespace
 
@@ -54,6 +161,7 @@ class Buffer(object):
         self.comment_recovery = comment_recovery
         self.namechars = namechars
         self._namechar_set = set(namechars)
+        self._namechar_re = self._compile_namechar_re()
         if namechars:
             self.nameguard = True
 
@@ -62,13 +170,43 @@ class Buffer(object):
         self._linecount = 0
         self._lines = []
         self._line_index = []
-        self._line_cache = []
+        self._line_starts = []
         self._comment_index = []
         self._re_cache = {}
+        self._tokens_re_cache = {}
+        self._folded_text = None
+        self._folded_tokens = {}
 
         self._preprocess()
         self._postprocess()
 
+    @classmethod
+    def from_file(cls, filename, mmap=False, encoding='utf-8', **kwargs):
+        """
+        Create a buffer over the contents of the given file.
+
+        With `mmap=True` the file is memory-mapped and parsed in place
+        by a `MmapBuffer` that keeps the settings of this buffer class.
+        """
+        if not mmap:
+            with io.open(filename, encoding=encoding) as f:
+                return cls(f.read(), filename=filename, **kwargs)
+
+        buffer_class = cls
+        if not issubclass(cls, MmapBuffer):
+            name = str('Mmap' + cls.__name__)
+            buffer_class = type(name, (MmapBuffer, cls), {})
+
+        with io.open(filename, 'rb') as f:
+            if os.fstat(f.fileno()).st_size:
+                text = memory_map(f.fileno(), 0, access=ACCESS_READ)
+            else:
+                text = b''
+        return buffer_class(text, filename=filename, encoding=encoding, **kwargs)
+
+    def _decode_text(self, text):
+        return ustr(text)
+
     @property
     def whitespace(self):
         return self._whitespace
@@ -77,6 +215,28 @@ class Buffer(object):
     def whitespace(self, value):
         self._whitespace = value
         self.whitespace_re = self.build_whitespace_re(value)
+        self._skip_re = None
+        self._skip_positions.clear()
+
+    @property
+    def comments_re(self):
+        return self._comments_re
+
+    @comments_re.setter
+    def comments_re(self, value):
+        self._comments_re = value
+        self._skip_re = None
+        self._skip_positions.clear()
+
+    @property
+    def eol_comments_re(self):
+        return self._eol_comments_re
+
+    @eol_comments_re.setter
+    def eol_comments_re(self, value):
+        self._eol_comments_re = value
+        self._skip_re = None
+        self._skip_positions.clear()
 
     @staticmethod
     def build_whitespace_re(whitespace):
@@ -101,10 +261,11 @@ class Buffer(object):
         self.text = self.join_block_lines(lines)
 
     def _postprocess(self):
-        cache, count = PosLine.build_line_cache(self._lines)
-        self._line_cache = cache
+        starts, count = PosLine.build_line_starts(self._lines)
+        self._line_starts = starts
         self._linecount = count
         self._len = len(self.text)
+        self._folded_text = None
 
     def _preprocess_block(self, name, block, **kwargs):
         lines = self.split_block_lines(block)
@@ -151,6 +312,7 @@ class Buffer(object):
         self.text = self.join_block_lines(lines)
         self._line_index = index
         self._postprocess()
+        self._skip_positions.clear()
 
         newtext = self.join_block_lines(lines[j + 1:endline + 2])
         return endline, newtext
@@ -171,16 +333,23 @@ class Buffer(object):
     def col(self):
         return self.poscol()
 
+    def _posline_info(self, pos):
+        if pos >= self._len:
+            return PosLine(self._len, self._linecount, 0)
+        starts = self._line_starts
+        n = bisect_right(starts, pos) - 1
+        start = starts[n]
+        return PosLine(start, n, starts[n + 1] - start)
+
     def posline(self, pos=None):
         if pos is None:
             pos = self._pos
-        return self._line_cache[pos].line
+        return self._posline_info(pos).line
 
     def poscol(self, pos=None):
         if pos is None:
             pos = self._pos
-        start = self._line_cache[pos].start
-        return pos - start
+        return pos - self._posline_info(pos).start
 
     def atend(self):
         return self._pos >= self._len
@@ -214,6 +383,12 @@ class Buffer(object):
     def move(self, n):
         self.goto(self.pos + n)
 
+    def release(self, pos):
+        """
+        Signal that parsing will not go back to positions before `pos`.
+        """
+        pass
+
     def comments(self, p, clear=False):
         if not self.comment_recovery or not self._comment_index:
             return CommentInfo([], [])
@@ -260,7 +435,58 @@ class Buffer(object):
         comments = self._eat_regex(self.eol_comments_re)
         self._index_comments(comments, lambda x: x.eol)
 
+    def build_skip_re(self):
+        """
+        Fuse the regexes for comments and whitespace into one that skips
+        all of them in a single match, or return False if `next_token()`
+        must eat them one at a time.
+        """
+        if self.comment_recovery:
+            # comments must be indexed by kind
+            return False
+        regexes = [
+            self._compile(regex)
+            for regex in (self.eol_comments_re, self.comments_re, self.whitespace_re)
+            if regex is not None
+        ]
+        return fuse_skip_regexes(regexes) or False
+
     def next_token(self):
+        """
+        Skip comments and whitespace. With `skip_cache` set, the position
+        reached from each starting position is remembered, so the options
+        tried from the same position don't skip the same text again.
+        """
+        if not self.skip_cache:
+            return self._next_token()
+
+        p = self._pos
+        q = self._skip_positions.get(p)
+        if q is not None:
+            self.goto(q)
+        else:
+            self._next_token()
+            q = self._pos
+            self._skip_positions[p] = self._skip_positions[q] = q
+
+    def prune_skip_cache(self, pos):
+        """
+        Forget the skips from positions before `pos`.
+        """
+        positions = self._skip_positions
+        if positions:
+            self._skip_positions = {p: q for p, q in positions.items() if p >= pos}
+
+    def _next_token(self):
+        skip_re = self._skip_re
+        if skip_re is None:
+            skip_re = self._skip_re = self.build_skip_re()
+        if skip_re:
+            matched = self._scanre(skip_re)
+            if matched.end() != matched.start():
+                self.move(matched.end() - matched.start())
+            return
+
         p = None
         while self._pos != p:
             p = self._pos
@@ -296,31 +522,94 @@ class Buffer(object):
     def is_name_char(self, c):
         return c is not None and c.isalnum() or c in self._namechar_set
 
+    def _namechar_source(self, namechars=None):
+        namechars = namechars if namechars is not None else self.namechars
+        if namechars:
+            return '%s|[%s]' % (ALNUM_RE_SOURCE, regexp.escape(namechars))
+        return ALNUM_RE_SOURCE
+
+    def _compile_namechar_re(self):
+        return regexp.compile(self._namechar_source(), RE_FLAGS)
+
+    def _is_name_char_at(self, p):
+        return self._namechar_re.match(self.text, p) is not None
+
     def match(self, token, ignorecase=None):
         ignorecase = ignorecase if ignorecase is not None else self.ignorecase
 
         if token is None:
             return self.atend()
 
-        p = self.pos
-        if ignorecase:
-            is_match = self.text[p:p + len(token)].lower() == token.lower()
-        else:
-            is_match = self.text[p:p + len(token)] == token
+        p = self._pos
+        length = self._scan_token(token, p, ignorecase)
+        if length is None:
+            return None
 
-        if is_match:
-            self.move(len(token))
-            if not self.nameguard:
-                return token
+        if self.nameguard and token.isalnum() and token[0].isalpha():
+            if self._is_name_char_at(p + length):
+                # a partial match of a name
+                return None
+        self.goto(p + length)
+        return token
+
+    def match_any(self, tokens, ignorecase=None):
+        """
+        Match the first of `tokens` that `match()` would match at the
+        current position, with a single regex for all of them.
+        """
+        ignorecase = ignorecase if ignorecase is not None else self.ignorecase
 
-            partial_match = (
-                token.isalnum() and
-                token[0].isalpha() and
-                self.is_name_char(self.current())
+        key = (tokens, ignorecase)
+        re = self._tokens_re_cache.get(key)
+        if re is None:
+            re = self._tokens_re_cache[key] = self._compile(
+                self.build_tokens_re(tokens),
+                ignorecase=ignorecase
             )
-            if not partial_match:
-                return token
-        self.goto(p)
+
+        matched = self._scanre(re)
+        if matched is None:
+            return None
+        self.move(matched.end() - matched.start())
+        return tokens[matched.lastindex - 1]
+
+    def build_tokens_re(self, tokens):
+        guard = '(?!%s)' % self._namechar_source()
+
+        options = []
+        for token in tokens:
+            option = '(%s)' % regexp.escape(token)
+            if self.nameguard and token.isalnum() and token[0].isalpha():
+                option += guard
+            options.append(option)
+        return '|'.join(options)
+
+    def _scan_token(self, token, p, ignorecase):
+        if not ignorecase:
+            return len(token) if self.text.startswith(token, p) else None
+
+        folded = self._folded_text
+        if folded is None:
+            folded = self._folded_text = self._fold_text()
+        folded_token = self._folded_tokens.get(token)
+        if folded_token is None:
+            folded_token = self._folded_tokens[token] = token.lower()
+        if folded and len(folded_token) == len(token):
+            return len(token) if folded.startswith(folded_token, p) else None
+
+        text = self.text[p:p + len(token)]
+        return len(token) if text.lower() == folded_token else None
+
+    def _fold_text(self):
+        # A lowercase copy of the text, usable only if lowering the whole
+        # text gives the same as lowering any slice of it. That is not so
+        # if a character lowers to several, as U+0130 does, or for the
+        # capital sigma, which lowers to the final sigma at the end of a
+        # word.
+        if CONTEXTUAL_LOWER_CHAR in self.text:
+            return False
+        folded = self.text.lower()
+        return folded if len(folded) == len(self.text) else False
 
     def matchre(self, pattern, ignorecase=None):
         matched = self._scanre(pattern, ignorecase=ignorecase)
@@ -329,20 +618,17 @@ class Buffer(object):
             self.move(len(token))
             return token
 
-    def _scanre(self, pattern, ignorecase=None, offset=0):
+    def _compile(self, pattern, ignorecase=None):
         ignorecase = ignorecase if ignorecase is not None else self.ignorecase
 
         if isinstance(pattern, RETYPE):
-            re = pattern
-        elif pattern in self._re_cache:
-            re = self._re_cache[pattern]
-        else:
-            flags = RE_FLAGS | (regexp.IGNORECASE if ignorecase else 0)
-            re = regexp.compile(
-                pattern,
-                flags
-            )
-            self._re_cache[pattern] = re
+            if ignorecase and not pattern.flags & regexp.IGNORECASE:
+                return compiled_regex(pattern.pattern, pattern.flags | regexp.IGNORECASE)
+            return pattern
+        return compiled_regex(pattern, RE_FLAGS | (regexp.IGNORECASE if ignorecase else 0))
+
+    def _scanre(self, pattern, ignorecase=None, offset=0):
+        re = self._compile(pattern, ignorecase=ignorecase)
         return re.match(self.text, self.pos + offset)
 
     @property
@@ -353,10 +639,10 @@ class Buffer(object):
         if pos is None:
             pos = self._pos
 
-        if pos >= len(self._line_cache):
+        if pos > self._len:
             return LineInfo(self.filename, self.linecount, 0, self._len, self._len, '')
 
-        start, line, length = self._line_cache[pos]
+        start, line, length = self._posline_info(pos)
         end = start + length
         col = pos - start
 
@@ -396,3 +682,512 @@ class Buffer(object):
 
     def __json__(self):
         return None
+
+
+class MmapBuffer(Buffer):
+    """
+    A buffer that parses a bytes-like object, usually a memory-mapped file,
+    without making a decoded copy of it.
+
+    Tokens and patterns are encoded once and matched against the raw bytes,
+    and only what is matched is decoded. Positions are byte offsets. Line
+    information is computed only when first requested, and no `include`
+    preprocessing is done.
+
+    A bytes pattern only agrees with the text pattern it was encoded from
+    over ASCII text, because `.`, `\\w`, or `[^"]` match a single byte of
+    a multibyte character. When a match, or the byte after it, is not
+    ASCII, or a match fails where the pattern could reach non-ASCII text,
+    the pattern is matched again against at least `lookahead` bytes of decoded text,
+    so matches end on character boundaries. Bytes patterns given by the
+    grammar are always matched against the raw bytes.
+    """
+    lookahead_size = 4 * 1024
+
+    def __init__(self, text, encoding='utf-8', **kwargs):
+        self.encoding = encoding
+        self._encoded_tokens = {}
+        # the last position searched for non-ASCII bytes, and the result
+        self._non_ascii = (0, -1)
+        self._eol_regexes = {}
+        super(MmapBuffer, self).__init__(text, **kwargs)
+
+    def _decode_text(self, text):
+        return text
+
+    def _preprocess(self, *args, **kwargs):
+        pass
+
+    def _postprocess(self):
+        self._line_starts = None
+        self._linecount = 0
+        self._len = len(self.text)
+
+    def replace_lines(self, i, j, name, block):
+        raise ParseError('cannot replace lines in %s' % type(self).__name__)
+
+    def close(self):
+        if isinstance(self.text, memory_map):
+            self.text.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def _decode(self, data):
+        return data.decode(self.encoding)
+
+    def _encode(self, token):
+        encoded = self._encoded_tokens.get(token)
+        if encoded is None:
+            encoded = self._encoded_tokens[token] = token.encode(self.encoding)
+        return encoded
+
+    def _build_line_starts(self):
+        starts = array('q', [0])
+        starts.extend(m.end() for m in BYTES_EOL_RE.finditer(self.text))
+        count = len(starts)
+        if starts[-1] != self._len:
+            starts.append(self._len)
+        self._line_starts = starts
+        self._linecount = count
+
+    def _posline_info(self, pos):
+        if self._line_starts is None:
+            self._build_line_starts()
+        return super(MmapBuffer, self)._posline_info(pos)
+
+    @property
+    def linecount(self):
+        if self._line_starts is None:
+            self._build_line_starts()
+        return self._linecount
+
+    def current(self):
+        return self.at(self._pos)
+
+    def at(self, p):
+        if p >= self._len:
+            return None
+        # enough bytes for any single character in the supported encodings
+        return self.text[p:p + 4].decode(self.encoding, 'ignore')[:1] or None
+
+    def next(self):
+        c = self.current()
+        if c is not None:
+            self._pos += len(c.encode(self.encoding))
+        return c
+
+    def match_any(self, tokens, ignorecase=None):
+        p = self._pos
+        token = super(MmapBuffer, self).match_any(tokens, ignorecase=ignorecase)
+        c = self.current()
+        if token is not None and c is not None and ord(c) > 127 and self.nameguard:
+            # the bytes regex can't tell if a non-ASCII character is alphanumeric
+            self.goto(p)
+            for token in tokens:
+                if self.match(token, ignorecase=ignorecase) is not None:
+                    return token
+            return None
+        return token
+
+    def skip_to(self, c):
+        p = self.text.find(self._encode(c), self._pos)
+        self.goto(p if p >= 0 else self._len)
+        return self.pos
+
+    def _scan_token(self, token, p, ignorecase):
+        btoken = self._encode(token)
+        if not ignorecase:
+            # mmap objects have no startswith()
+            return len(btoken) if self.text.find(btoken, p, p + len(btoken)) == p else None
+
+        text = self.text[p:p + len(btoken)]
+        return len(btoken) if text.lower() == btoken.lower() else None
+
+    def _namechar_source(self, namechars=None):
+        # bytes regexes can only tell ASCII characters apart
+        namechars = namechars if namechars is not None else self.namechars
+        ascii_namechars = ''.join(c for c in namechars if ord(c) < 128)
+        return super(MmapBuffer, self)._namechar_source(ascii_namechars)
+
+    def _compile_namechar_re(self):
+        return regexp.compile(self._encode(self._namechar_source()), regexp.MULTILINE)
+
+    def _is_name_char_at(self, p):
+        if self._namechar_re.match(self.text, p) is not None:
+            return True
+        c = self.at(p)
+        return c is not None and ord(c) > 127 and self.is_name_char(c)
+
+    def matchre(self, pattern, ignorecase=None):
+        matched = self._scanre(pattern, ignorecase=ignorecase)
+        if matched:
+            self.move(len(matched.group()))
+            return self._decode(matched.group())
+
+    def _next_non_ascii(self, pos):
+        start, n = self._non_ascii
+        if not start <= pos <= n:
+            m = NON_ASCII_BYTES_RE.search(self.text, pos)
+            n = m.start() if m else self._len
+            self._non_ascii = (pos, n)
+        return n
+
+    def _scanre(self, pattern, ignorecase=None, offset=0):
+        re = self._compile(pattern, ignorecase=ignorecase)
+        pos = self._pos + offset
+        matched = re.match(self.text, pos)
+
+        n = self._next_non_ascii(pos)
+        if n >= self._len:
+            return matched
+        elif matched is not None and matched.end() < n:
+            return matched
+        elif isinstance(pattern, RETYPE) and isinstance(pattern.pattern, bytes):
+            return matched
+
+        textre = super(MmapBuffer, self)._compile(pattern, ignorecase=ignorecase)
+        if matched is None and self.text.find(b'\n', pos, n) >= 0:
+            # a failure before the line with non-ASCII text stands when
+            # the pattern can't reach that line
+            eol = self._eol_regexes.get(textre)
+            if eol is None:
+                eol = self._eol_regexes[textre] = may_match_eol(textre)
+            if not eol:
+                return matched
+        return self._scan_decoded(textre, pos)
+
+    def _scan_decoded(self, re, pos):
+        # back up a few bytes, so anchors and lookbehinds see the
+        # character before the position
+        start = max(0, pos - 4)
+        before = len(self.text[start:pos].decode(self.encoding, 'ignore'))
+        size = self.lookahead_size
+        while True:
+            end = min(self._len, pos + size)
+            decoder = codecs.getincrementaldecoder(self.encoding)('ignore')
+            text = decoder.decode(self.text[start:end], end >= self._len)
+            matched = re.match(text, before)
+            if not matched or end >= self._len or matched.end() < len(text):
+                break
+            size *= 2
+        if matched:
+            return EncodedMatch(pos, matched, self.encoding)
+
+    def _compile(self, pattern, ignorecase=None):
+        ignorecase = ignorecase if ignorecase is not None else self.ignorecase
+
+        key = (pattern, ignorecase)
+        re = self._re_cache.get(key)
+        if re is None:
+            if pattern is WHITESPACE_RE:
+                re = BYTES_WHITESPACE_RE
+            elif isinstance(pattern, RETYPE) and isinstance(pattern.pattern, bytes):
+                re = pattern
+            elif isinstance(pattern, RETYPE):
+                flags = pattern.flags & ~regexp.UNICODE
+                if ignorecase:
+                    flags |= regexp.IGNORECASE
+                re = compiled_regex(self._encode(pattern.pattern), flags)
+            else:
+                flags = regexp.MULTILINE | (regexp.IGNORECASE if ignorecase else 0)
+                re = compiled_regex(self._encode(pattern), flags)
+            self._re_cache[key] = re
+        return re
+
+    def line_info(self, pos=None):
+        if pos is None:
+            pos = self._pos
+
+        if pos > self._len:
+            return LineInfo(self.filename, self.linecount, 0, self._len, self._len, '')
+
+        start, line, length = self._posline_info(pos)
+        end = start + length
+        col = len(self.text[start:pos].decode(self.encoding, 'replace'))
+        text = self.text[start:end].decode(self.encoding, 'replace')
+        return LineInfo(self.filename, line, col, start, end, text)
+
+    def get_line(self, n=None):
+        if n is None:
+            n = self.line
+        return self.get_lines(n, n)[0]
+
+    def get_lines(self, start=None, end=None):
+        if self._line_starts is None:
+            self._build_line_starts()
+        starts = self._line_starts
+        if start is None:
+            start = 0
+        if end is None:
+            end = len(starts) - 2
+        end = min(end + 1, len(starts) - 1)
+        return [
+            self._decode(self.text[starts[n]:starts[n + 1]])
+            for n in range(start, end)
+        ]
+
+    def line_index(self, start=0, end=None):
+        if end is None:
+            end = self.linecount - 1
+        return [LineIndexInfo(self.filename, n) for n in range(start, 1 + end)]
+
+
+class EncodedMatch(object):
+    """
+    A match against decoded text, with the offsets of the encoded bytes.
+    """
+    def __init__(self, pos, matched, encoding):
+        self._group = matched.group().encode(encoding)
+        self._start = pos
+        self.lastindex = matched.lastindex
+
+    def group(self):
+        return self._group
+
+    def start(self):
+        return self._start
+
+    def end(self):
+        return self._start + len(self._group)
+
+
+class StreamBuffer(Buffer):
+    """
+    A buffer that reads its text incrementally from a file-like object
+    or from an iterable of strings.
+
+    Text is read in chunks as the parse position advances. When the parser
+    signals with `release()` that it will not backtrack before a position,
+    the text and line information before it are discarded, save for the
+    last `window` characters, so memory stays proportional to the window
+    and not to the size of the input.
+
+    Patterns are matched against at least `lookahead` characters of text,
+    and are retried with more text when a match reaches the end of what
+    has been read. Going back to a discarded position raises `ParseError`.
+
+    Bytes are decoded with `encoding`. Text is discarded by whole lines,
+    so the text of an input without line breaks is kept entirely, and
+    more text is read each time at least as much as is kept.
+    """
+    def __init__(self, stream, chunk_size=64 * 1024, window=4 * 1024, lookahead=1024,
+                 encoding='utf-8', **kwargs):
+        if hasattr(stream, 'read'):
+            stream = self._read_chunks(stream, chunk_size)
+        self._chunks = iter(stream)
+        self._decoder = codecs.getincrementaldecoder(encoding)()
+        self.chunk_size = chunk_size
+        self.window = window
+        self.lookahead_size = lookahead
+        self._offset = 0
+        self._line_base = 0
+        self._scanned = 0
+        self._exhausted = False
+        super(StreamBuffer, self).__init__('', **kwargs)
+
+    def _preprocess(self, *args, **kwargs):
+        pass
+
+    def _postprocess(self):
+        self._line_starts = array('q', [0])
+        self._len = 0
+
+    def replace_lines(self, i, j, name, block):
+        raise ParseError('cannot replace lines in %s' % type(self).__name__)
+
+    @staticmethod
+    def _read_chunks(stream, chunk_size):
+        while True:
+            chunk = stream.read(chunk_size)
+            if not chunk:
+                return
+            yield chunk
+
+    def _next_chunk(self):
+        try:
+            chunk = next(self._chunks)
+        except StopIteration:
+            self._exhausted = True
+            return self._decoder.decode(b'', True)
+        if isinstance(chunk, bytes):
+            return self._decoder.decode(chunk)
+        return ustr(chunk)
+
+    def _fill(self, upto):
+        if self._exhausted or self._len >= upto:
+            return
+
+        # read at least as much as is kept, so the text kept is copied
+        # a logarithmic number of times until it is released
+        upto = max(upto, self._len + len(self.text))
+        chunks = [self.text]
+        length = self._len
+        while not self._exhausted and length < upto:
+            chunk = self._next_chunk()
+            chunks.append(chunk)
+            length += len(chunk)
+        self.text = ''.join(chunks)
+        self._len = length
+        self._scan_lines()
+
+    def _scan_lines(self):
+        starts = self._line_starts
+        offset = self._offset
+        for m in EOL_RE.finditer(self.text, self._scanned - offset):
+            if m.group() == '\r' and m.end() == len(self.text) and not self._exhausted:
+                # could be the first half of a \r\n
+                self._scanned = offset + m.start()
+                return
+            starts.append(offset + m.end())
+        self._scanned = self._len
+
+    def _index(self, p):
+        if p < self._offset:
+            raise ParseError(
+                'position %d was discarded by %s' % (p, type(self).__name__)
+            )
+        return p - self._offset
+
+    def release(self, pos):
+        starts = self._line_starts
+        n = bisect_right(starts, pos - self.window) - 1
+        if n <= 0 or starts[n] - self._offset < self.chunk_size:
+            return
+        self.text = self.text[self._index(starts[n]):]
+        self._offset = starts[n]
+        self._skip_positions.clear()
+        del starts[:n]
+        self._line_base += n
+
+    @property
+    def linecount(self):
+        return self._line_base + len(self._line_starts)
+
+    def _count_lines(self):
+        # the count of lines as given by splitlines() on the text read so far
+        count = self.linecount
+        if self._line_starts[-1] == self._len:
+            count -= 1
+        return count
+
+    def _posline_info(self, pos):
+        self._fill(pos + 1)
+        if pos >= self._len:
+            return PosLine(self._len, self.linecount, 0)
+        starts = self._line_starts
+        if pos < starts[0]:
+            return PosLine(pos, self._line_base, 0)
+        n = bisect_right(starts, pos) - 1
+        while n + 1 >= len(starts) and not self._exhausted:
+            # read to the end of the line
+            self._fill(self._len + self.chunk_size)
+        start = starts[n]
+        end = starts[n + 1] if n + 1 < len(starts) else self._len
+        return PosLine(start, self._line_base + n, end - start)
+
+    def atend(self):
+        self._fill(self._pos + 1)
+        return self._pos >= self._len
+
+    def at(self, p):
+        self._fill(p + 1)
+        if p >= self._len:
+            return None
+        return self.text[self._index(p)]
+
+    def current(self):
+        return self.at(self._pos)
+
+    def next(self):
+        c = self.current()
+        if c is not None:
+            self._pos += 1
+        return c
+
+    def goto(self, p):
+        self._fill(p)
+        self._pos = max(0, min(self._len, p))
+
+    def skip_to(self, c):
+        while True:
+            p = self.text.find(c, self._index(self._pos))
+            if p >= 0:
+                self.goto(self._offset + p)
+                return self.pos
+            if self._exhausted:
+                self.goto(self._len)
+                return self.pos
+            self._pos = self._len
+            self._fill(self._len + self.chunk_size)
+
+    def _scan_token(self, token, p, ignorecase):
+        self._fill(p + len(token) + 1)
+        i = self._index(p)
+        if not ignorecase:
+            return len(token) if self.text.startswith(token, i) else None
+
+        text = self.text[i:i + len(token)]
+        return len(token) if text.lower() == token.lower() else None
+
+    def _is_name_char_at(self, p):
+        self._fill(p + 1)
+        return p < self._len and self._namechar_re.match(self.text, self._index(p)) is not None
+
+    def _scanre(self, pattern, ignorecase=None, offset=0):
+        re = self._compile(pattern, ignorecase=ignorecase)
+
+        pos = self._pos + offset
+        self._fill(pos + self.lookahead_size)
+        while True:
+            matched = re.match(self.text, self._index(pos))
+            if not matched or self._exhausted or matched.end() < len(self.text):
+                return matched
+            self._fill(self._len + self.chunk_size)
+
+    def line_info(self, pos=None):
+        if pos is None:
+            pos = self._pos
+
+        start, line, length = self._posline_info(pos)
+        if pos > self._len:
+            return LineInfo(self.filename, line, 0, start, start, '')
+        elif pos == self._len:
+            # the end of the text is on the last line
+            line = max(0, min(line, self._count_lines() - 1))
+        if start < self._offset:
+            return LineInfo(self.filename, line, 0, pos, pos, '')
+
+        end = start + length
+        text = self.text[self._index(start):self._index(end)]
+        return LineInfo(self.filename, line, pos - start, start, end, text)
+
+    def get_line(self, n=None):
+        if n is None:
+            n = self.line
+        return self.get_lines(n, n)[0]
+
+    def get_lines(self, start=None, end=None):
+        if start is None:
+            start = self._line_base
+        if end is None:
+            self._fill(float('inf'))
+            end = self._count_lines() - 1
+        result = []
+        for n in range(max(start, self._line_base), end + 1):
+            i = n - self._line_base
+            starts = self._line_starts
+            if i >= len(starts):
+                break
+            linestart = starts[i]
+            lineend = starts[i + 1] if i + 1 < len(starts) else self._len
+            result.append(self.text[self._index(linestart):self._index(lineend)])
+        return result
+
+    def line_index(self, start=0, end=None):
+        if end is None:
+            end = self.linecount - 1
+        return [LineIndexInfo(self.filename, n) for n in range(start, 1 + end)]
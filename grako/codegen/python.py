@@ -6,6 +6,8 @@ Python code generation for models defined with grako.model
 """
 from __future__ import absolute_import, division, print_function, unicode_literals
 
+from collections import OrderedDict
+
 from grako.util import (
     indent,
     safe_name,
@@ -22,6 +24,19 @@ from grako.codegen.cgbase import ModelRenderer, CodeGenerator
 
 
 class PythonCodeGenerator(CodeGenerator):
+    def __init__(self, modules=None):
+        super(PythonCodeGenerator, self).__init__(modules=modules)
+        self.patterns = OrderedDict()
+
+    def pattern_constant(self, pattern):
+        """
+        The name of the module constant for the compiled `pattern`.
+        """
+        name = self.patterns.get(pattern)
+        if name is None:
+            name = self.patterns[pattern] = 'PATTERN_%d' % len(self.patterns)
+        return name
+
     def _find_renderer_class(self, item):
         if not isinstance(item, Node):
             return None
@@ -94,9 +109,12 @@ class Constant(Base):
 
 
 class Pattern(Base):
+    @staticmethod
+    def raw_repr(pattern):
+        return 'r' + urepr(pattern).replace("\\\\", '\\')
+
     def render_fields(self, fields):
-        raw_repr = 'r' + urepr(self.node.pattern).replace("\\\\", '\\')
-        fields.update(pattern=raw_repr)
+        fields.update(pattern=self.codegen.pattern_constant(self.node.pattern))
 
     template = 'self._pattern({pattern})'
 
@@ -124,19 +142,44 @@ class Sequence(Base):
 
 class Choice(Base):
     def render_fields(self, fields):
+        firstset = ' '.join(f[0] for f in sorted(self.node.firstset) if f)
+        if firstset:
+            error = 'expecting one of: ' + firstset
+        else:
+            error = 'no available options'
+
+        if self.node.tokens:
+            tokens = ', '.join(urepr(t) for t in self.node.tokens)
+            fields.update(tokens=tokens, error=urepr(error))
+            return self.tokens_template
+
         template = trim(self.option_template)
         options = [
             template.format(
                 option=indent(self.rend(o))) for o in self.node.options
         ]
+        n = self.counter()
+
+        dispatch = ''
+        option_chars = self.node.option_chars or []
+        if sum(1 for chars in option_chars if chars is not None) > 1:
+            # only try the options that may start with the next character
+            dispatch = trim(self.dispatch_template).format(n=n) + '\n'
+            option_refs = self.node.option_refs
+            options = [
+                option if chars is None else trim(
+                    self.ref_guard_template if refs else self.guard_template
+                ).format(
+                    n=n,
+                    chars=', '.join(urepr(c) for c in sorted(chars)),
+                    option=indent(option),
+                )
+                for option, chars, refs in zip(options, option_chars, option_refs)
+            ]
+
         options = '\n'.join(o for o in options)
-        firstset = ' '.join(f[0] for f in sorted(self.node.firstset) if f)
-        if firstset:
-            error = 'expecting one of: ' + firstset
-        else:
-            error = 'no available options'
-        fields.update(n=self.counter(),
-                      options=indent(options),
+        fields.update(n=n,
+                      options=indent(dispatch + options),
                       error=urepr(error)
                       )
 
@@ -151,6 +194,25 @@ class Choice(Base):
                     {option}\
                     '''
 
+    dispatch_template = '''\
+                    c{n}, t{n} = self._lookahead_char()\
+                    '''
+
+    guard_template = '''\
+                    if c{n} in {{{chars}}}:
+                    {option}\
+                    '''
+
+    # skipping an option that invokes rules is visible in error reports
+    ref_guard_template = '''\
+                    if t{n} or c{n} in {{{chars}}}:
+                    {option}\
+                    '''
+
+    tokens_template = '''\
+                self._token_choice(({tokens}), {error})\
+                '''
+
     template = '''\
                 with self._choice():
                 {options}
@@ -358,8 +420,9 @@ class Rule(_Decorator):
         if not (sdefs or ldefs):
             sdefines = ''
         else:
-            sdefs = '[%s]' % ', '.join(urepr(d) for d in sorted(sdefs))
-            ldefs = '[%s]' % ', '.join(urepr(d) for d in sorted(ldefs))
+            # tuples of constants are built once, when the parser is compiled
+            sdefs = self.tuple_repr(sorted(sdefs))
+            ldefs = self.tuple_repr(sorted(ldefs))
             if not ldefs:
                 sdefines = '\n\n    self.ast._define(%s, %s)' % (sdefs, ldefs)
             else:
@@ -371,10 +434,17 @@ class Rule(_Decorator):
         fields.update(defines=sdefines)
         fields.update(
             check_name='\n    self._check_name()' if self.is_name else '',
+            nomemo='' if self.is_memo else '\n@nomemo',
         )
 
+    @staticmethod
+    def tuple_repr(items):
+        if len(items) == 1:
+            return '(%s,)' % urepr(items[0])
+        return '(%s)' % ', '.join(urepr(d) for d in items)
+
     template = '''
-        @graken({params})
+        @graken({params}){nomemo}
         def _{name}_(self):
         {exp:1::}{check_name}{defines}
         '''
@@ -437,6 +507,17 @@ class Grammar(Base):
         if keywords:
             keywords = '\n%s\n' % keywords
 
+        left_recursive_rules = ', '.join(
+            urepr(rule.name) for rule in self.node.rules if rule.is_leftrec
+        )
+
+        patterns = '\n'.join(
+            '%s = re.compile(%s, RE_FLAGS)' % (name, Pattern.raw_repr(pattern))
+            for pattern, name in self.codegen.patterns.items()
+        )
+        if patterns:
+            patterns = '\n\n' + patterns
+
         fields.update(rules=indent(rules),
                       abstract_rules=abstract_rules,
                       version=version,
@@ -449,6 +530,8 @@ class Grammar(Base):
                       parseinfo=parseinfo,
                       keywords=keywords,
                       namechars=namechars,
+                      left_recursive_rules=left_recursive_rules,
+                      patterns=patterns,
                       )
 
     abstract_rule_template = '''
@@ -473,11 +556,11 @@ class Grammar(Base):
                 from __future__ import print_function, division, absolute_import, unicode_literals
 
                 from grako.buffering import Buffer
-                from grako.parsing import graken, Parser
+                from grako.parsing import graken, nomemo, Parser  # noqa
                 from grako.util import re, RE_FLAGS, generic_main  # noqa
 
 
-                KEYWORDS = {{{keywords}}}
+                KEYWORDS = {{{keywords}}}{patterns}
 
 
                 class {name}Buffer(Buffer):
@@ -505,6 +588,8 @@ class Grammar(Base):
 
 
                 class {name}Parser(Parser):
+                    left_recursive_rules = frozenset([{left_recursive_rules}])
+
                     def __init__(
                         self,
                         whitespace={whitespace},
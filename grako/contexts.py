@@ -14,11 +14,14 @@ from ._unicode_characters import (
     C_FAILURE,
     C_RECURSION,
 )
-from grako.util import notnone, ustr, prune_dict, is_list, info, safe_name
-from grako.util import left_assoc, right_assoc
+from grako.util import notnone, ustr, is_list, info, safe_name
+from grako.util import left_assoc, right_assoc, LinkedStack
 from grako.ast import AST
-from grako.infos import ParseInfo
+from grako.infos import ParseInfo, RuleInfo
+from grako.memos import LeftRecursion, RecursionHead, memo_key, new_memo_cache
 from grako import buffering
+from grako import tracing
+from grako.profiling import ParseProfile
 from grako import color
 from grako.exceptions import (
     FailedCut,
@@ -39,22 +42,37 @@ __all__ = ['ParseContext']
 # decorator for rule implementation methods
 def graken(*params, **kwparams):
     def decorator(rule):
+        memoize = not getattr(rule, 'nomemo', False)
+        # remove the single leading and trailing underscore
+        # that the parser generator added
+        name = rule.__name__[1:-1]
+        ruleinfo = RuleInfo.new(rule, name, params, kwparams, memoize)
+
         @functools.wraps(rule)
         def wrapper(self):
-            name = rule.__name__
-            # remove the single leading and trailing underscore
-            # that the parser generator added
-            name = name[1:-1]
-            return self._call(rule, name, params, kwparams)
+            return self._call_rule(ruleinfo)
+        wrapper.ruleinfo = ruleinfo
         return wrapper
     return decorator
 
 
+# decorator for rule implementation methods whose results should
+# not be memoized, to be applied before graken()
+def nomemo(rule):
+    rule.nomemo = True
+    return rule
+
+
 class Closure(list):
     pass
 
 
 class ParseContext(object):
+    # The names of the rules that may be invoked again at the same
+    # position before they return, or None if unknown. Only those
+    # rules need a guard against infinite left recursion.
+    left_recursive_rules = None
+
     def __init__(self,
                  buffer_class=buffering.Buffer,
                  semantics=None,
@@ -67,10 +85,16 @@ class ParseContext(object):
                  ignorecase=False,
                  nameguard=None,
                  memoize_lookaheads=True,
+                 memo_limit=None,
+                 memo_policy=None,
+                 memo_heatmap=False,
+                 lazy_failures=False,
                  left_recursion=False,
                  trace_length=72,
                  trace_separator=C_DERIVE,
                  trace_filename=False,
+                 trace_sink=None,
+                 profile=False,
                  colorize=None,
                  keywords=None,
                  namechars='',
@@ -82,10 +106,12 @@ class ParseContext(object):
         self.semantics = semantics
         self.encoding = encoding
         self.parseinfo = parseinfo
-        self.trace = trace
+        self._trace_flag = trace
         self.trace_length = trace_length
         self.trace_separator = trace_separator
         self.trace_filename = trace_filename
+        self._trace_sink = trace_sink
+        self.profile = profile
 
         self.comments_re = comments_re
         self.eol_comments_re = eol_comments_re
@@ -93,27 +119,37 @@ class ParseContext(object):
         self.ignorecase = ignorecase
         self.nameguard = nameguard
         self.memoize_lookaheads = memoize_lookaheads
+        self.memo_limit = memo_limit
+        self.memo_policy = memo_policy
+        self.memo_heatmap = memo_heatmap
+        self.lazy_failures = lazy_failures
         self.left_recursion = left_recursion
         self.colorize = colorize
         self.keywords = set(keywords or [])
         self.namechars = namechars
 
+        self._bind_tracing()
+        self._bind_profiling()
         self._initialize_caches()
 
     def _initialize_caches(self):
         self._ast_stack = [AST()]
         self._concrete_stack = [None]
-        self._rule_stack = []
+        self._rule_stack = LinkedStack()
         self._cut_stack = [False]
-        self._memoization_cache = dict()
+        self._cut_positions = [None]
+        self._memoization_cache = new_memo_cache(self.memo_limit, self.memo_policy)
+        self._invocations = set() if self.memo_heatmap else None
+        self._memo_heat = {}
 
         self._last_node = None
         self._state = None
         self._lookahead = 0
 
-        self._recursive_results = dict()
-        self._recursive_eval = []
-        self._recursive_head = []
+        self._recursion_stack = None
+        self._recursion_heads = {}
+
+        self._failure_signals = {}
 
     def _reset(self,
                text=None,
@@ -121,12 +157,18 @@ class ParseContext(object):
                buffer_class=None,
                semantics=None,
                trace=None,
+               trace_sink=None,
+               profile=None,
                comments_re=None,
                eol_comments_re=None,
                whitespace=None,
                ignorecase=None,
                nameguard=None,
                memoize_lookaheads=None,
+               memo_limit=None,
+               memo_policy=None,
+               memo_heatmap=None,
+               lazy_failures=None,
                left_recursion=None,
                colorize=None,
                keywords=None,
@@ -138,10 +180,22 @@ class ParseContext(object):
             nameguard = self.nameguard
         if memoize_lookaheads is not None:
             self.memoize_lookaheads = memoize_lookaheads
+        if memo_limit is not None:
+            self.memo_limit = memo_limit
+        if memo_policy is not None:
+            self.memo_policy = memo_policy
+        if memo_heatmap is not None:
+            self.memo_heatmap = memo_heatmap
+        if lazy_failures is not None:
+            self.lazy_failures = lazy_failures
         if left_recursion is not None:
             self.left_recursion = left_recursion
         if trace is not None:
             self.trace = trace
+        if trace_sink is not None:
+            self.trace_sink = trace_sink
+        if profile is not None:
+            self.profile = profile
         if semantics is not None:
             self.semantics = semantics
         if colorize is not None:
@@ -153,6 +207,7 @@ class ParseContext(object):
         if namechars is not None:
             namechars = self.namechars
 
+        self._bind_profiling()
         self._initialize_caches()
         self._furthest_exception = None
 
@@ -171,10 +226,23 @@ class ParseContext(object):
                 namechars=namechars,
                 **kwargs)
         self._buffer = buffer
+        self._left_recursion_guard = FailedLeftRecursion(buffer, LinkedStack(), 'guard')
 
     def _set_furthest_exception(self, e):
         if not self._furthest_exception or e.pos > self._furthest_exception.pos:
-            self._furthest_exception = e
+            self._furthest_exception = self._detached_failure(e)
+
+    def _reported_exception(self):
+        return self._furthest_exception
+
+    def _detached_failure(self, e):
+        # With lazy_failures, the signal raised for a failure is reused by
+        # the next one, so it is copied before being kept.
+        if self._failure_signals.get(type(e)) is not e:
+            return e
+        failure = type(e)(e.buf, e._stack, e.item)
+        failure.pos = e.pos
+        return failure
 
     def parse(self,
               text,
@@ -202,10 +270,10 @@ class ParseContext(object):
             return result
         except FailedCut as e:
             self._set_furthest_exception(e.nested)
-            raise self._furthest_exception
+            raise self._reported_exception()
         except FailedParse as e:
             self._set_furthest_exception(e)
-            raise self._furthest_exception
+            raise self._reported_exception()
         finally:
             self._clear_cache()
 
@@ -224,9 +292,70 @@ class ParseContext(object):
     def _pos(self):
         return self._buffer.pos
 
+    @property
+    def memo_stats(self):
+        return self._memoization_cache.stats()
+
+    @property
+    def memo_heat(self):
+        """
+        With memo_heatmap=True, the number of times rules were invoked
+        again at a position of each line of the input, by line number.
+        """
+        return self._memo_heat
+
+    def _record_invocation(self, name, pos):
+        key = (pos, name)
+        if key in self._invocations:
+            line = self._buffer.line_info(pos).line
+            self._memo_heat[line] = self._memo_heat.get(line, 0) + 1
+        else:
+            self._invocations.add(key)
+
+    @property
+    def rule_profile(self):
+        """ The `profiling.ParseProfile` of the last parse, if profiling. """
+        return self._profile
+
+    @property
+    def semantics(self):
+        return self._semantics
+
+    @semantics.setter
+    def semantics(self, value):
+        self._semantics = value
+        self._semantic_actions = {}
+
+    @property
+    def trace(self):
+        return self._trace_flag
+
+    @trace.setter
+    def trace(self, value):
+        self._trace_flag = value
+        self._bind_tracing()
+
+    @property
+    def trace_sink(self):
+        return self._trace_sink
+
+    @trace_sink.setter
+    def trace_sink(self, value):
+        self._trace_sink = value
+        self._bind_tracing()
+
+    @property
+    def semantic_actions(self):
+        """
+        The (action, postproc) pairs looked up on the semantics so far, by
+        rule name. The cache is cleared when the semantics are replaced.
+        """
+        return self._semantic_actions
+
     def _clear_cache(self):
-        self._memoization_cache = dict()
-        self._recursive_results = dict()
+        self._memoization_cache.clear()
+        self._recursion_stack = None
+        self._recursion_heads = {}
 
     def _goto(self, pos):
         self._buffer.goto(pos)
@@ -234,6 +363,25 @@ class ParseContext(object):
     def _next_token(self):
         self._buffer.next_token()
 
+    def _lookahead_char(self):
+        # The first character of the next token, without consuming input,
+        # for generated choices to skip the options that can't start with
+        # it, and whether the options that invoke rules must all be tried
+        # anyway: a failure in them at the next token would be the furthest
+        # one, so skipping them would change the error reported.
+        pos = self._pos
+        self._next_token()
+        c = self._buffer.current()
+        exhaustive = self._pos > self._furthest_failure_pos()
+        self._goto(pos)
+        if c and self._buffer.ignorecase:
+            c = c.lower()[:1]
+        return c, exhaustive
+
+    def _furthest_failure_pos(self):
+        e = self._furthest_exception
+        return e.pos if e is not None else -1
+
     @property
     def ast(self):
         return self._ast_stack[-1]
@@ -322,17 +470,34 @@ class ParseContext(object):
         # be proven if doing it this way affects linearity. Empirically,
         # it hasn't.
         cutpos = self._pos
-
-        def prune_cache(cache):
-            prune_dict(cache, lambda k, _: k[0] < cutpos)
-
-        prune_cache(self._memoization_cache)
-        prune_cache(self._recursive_results)
+        if self._recursion_heads:
+            # left recursions grow from their starting positions
+            cutpos = min(cutpos, min(self._recursion_heads))
+
+        self._memoization_cache.prune(cutpos)
+        if self._buffer.skip_cache:
+            self._buffer.prune_skip_cache(cutpos)
+
+        # lookaheads go back to before the cut
+        if not self._lookahead:
+            self._buffer.release(self._backtrack_pos(cutpos))
+
+    def _backtrack_pos(self, cutpos):
+        # A cut commits only the innermost option or closure iteration.
+        # A failure after it completes still goes back to the start of
+        # the outermost enclosing one that wasn't cut.
+        cuts = self._cut_stack
+        for i in range(1, len(cuts)):
+            if not cuts[i]:
+                return min(cutpos, self._cut_positions[i])
+        return cutpos
 
     def _push_cut(self):
         self._cut_stack.append(False)
+        self._cut_positions.append(self._pos)
 
     def _pop_cut(self):
+        self._cut_positions.pop()
         return self._cut_stack.pop()
 
     def _enter_lookahead(self):
@@ -345,7 +510,7 @@ class ParseContext(object):
         return self.memoize_lookaheads or self._lookahead == 0
 
     def _rulestack(self):
-        stack = self.trace_separator.join(reversed(self._rule_stack))
+        stack = self.trace_separator.join(reversed(list(self._rule_stack)))
         if max(len(s) for s in stack.splitlines()) > self.trace_length:
             stack = stack[:self.trace_length]
             stack = stack.rsplit(self.trace_separator, 1)[0]
@@ -357,6 +522,13 @@ class ParseContext(object):
         return lambda: None  # makes static checkers happy
 
     def _find_semantic_rule(self, name):
+        actions = self._semantic_actions.get(name)
+        if actions is None:
+            actions = self._lookup_semantic_rule(name)
+            self._semantic_actions[name] = actions
+        return actions
+
+    def _lookup_semantic_rule(self, name):
         if self.semantics is None:
             return None, None
 
@@ -374,6 +546,23 @@ class ParseContext(object):
 
         return None, postproc
 
+    def _bind_tracing(self):
+        # The trace hooks are invoked only while tracing, so a parse
+        # that isn't traced pays for testing a flag, and not for the
+        # calls and the formatting of the trace.
+        self._tracing = bool(self.trace) or self.trace_sink is not None
+
+    def _bind_profiling(self):
+        # with profile=True every parse is profiled on its own
+        profile = self.profile
+        if profile is True:
+            profile = ParseProfile()
+        elif not profile:
+            profile = None
+        if profile is not None:
+            profile.start()
+        self._profile = profile
+
     def _trace(self, msg, *params):
         if self.trace:
             msg = msg % params
@@ -391,20 +580,43 @@ class ParseContext(object):
                         color.Style.RESET_ALL
                         )
 
+    def _trace_rule_event(self, kind, pos, endpos):
+        self.trace_sink.record(kind, self._rule_stack.top, pos, endpos)
+
     def _trace_entry(self):
-        self._trace_event(color.Fore.YELLOW + color.Style.BRIGHT + C_ENTRY)
+        if self.trace_sink is not None:
+            self._trace_rule_event(tracing.ENTRY, self._pos, self._pos)
+        else:
+            self._trace_event(color.Fore.YELLOW + color.Style.BRIGHT + C_ENTRY)
 
-    def _trace_success(self):
-        self._trace_event(color.Fore.GREEN + color.Style.BRIGHT + C_SUCCESS)
+    def _trace_success(self, pos=None):
+        if self.trace_sink is not None:
+            self._trace_rule_event(tracing.SUCCESS, notnone(pos, self._pos), self._pos)
+        else:
+            self._trace_event(color.Fore.GREEN + color.Style.BRIGHT + C_SUCCESS)
 
-    def _trace_failure(self):
-        self._trace_event(color.Fore.RED + color.Style.BRIGHT + C_FAILURE)
+    def _trace_failure(self, pos=None):
+        if self.trace_sink is not None:
+            pos = notnone(pos, self._pos)
+            self._trace_rule_event(tracing.FAILURE, pos, pos)
+        else:
+            self._trace_event(color.Fore.RED + color.Style.BRIGHT + C_FAILURE)
 
     def _trace_recursion(self):
-        self._trace_event(color.Fore.RED + color.Style.BRIGHT + C_RECURSION)
+        if self.trace_sink is not None:
+            self._trace_rule_event(tracing.RECURSION, self._pos, self._pos)
+        else:
+            self._trace_event(color.Fore.RED + color.Style.BRIGHT + C_RECURSION)
 
     def _trace_match(self, token, name=None, failed=False):
-        if self.trace:
+        if self.trace_sink is not None:
+            endpos = self._pos
+            if failed:
+                self._trace_rule_event(tracing.NOMATCH, endpos, endpos)
+            else:
+                # tokens and patterns are matched without skipping
+                self._trace_rule_event(tracing.MATCH, endpos - len(token), endpos)
+        elif self.trace:
             fname = ''
             if self.trace_filename:
                 fname = self._buffer.line_info().filename + '\n'
@@ -424,12 +636,31 @@ class ParseContext(object):
                 color.Style.RESET_ALL
             )
 
+    def _trace_constant(self, literal):
+        if self.trace_sink is not None:
+            # constants don't consume input
+            self._trace_rule_event(tracing.MATCH, self._pos, self._pos)
+        else:
+            self._trace_match(literal)
+
     def _error(self, item, etype=FailedParse):
-        raise etype(
-            self._buffer,
-            list(reversed(self._rule_stack[:])),
-            item
-        )
+        if self.lazy_failures:
+            self._signal_failure(item, etype)
+        raise etype(self._buffer, self._rule_stack, item)
+
+    def _signal_failure(self, item, etype):
+        # Raise a reusable instance of the exception type to unwind the
+        # parse. The failures that may be reported are copied from it by
+        # _set_furthest_exception().
+        signal = self._failure_signals.get(etype)
+        if signal is None:
+            signal = etype(self._buffer, self._rule_stack, item)
+            self._failure_signals[etype] = signal
+        else:
+            # describe this failure to whoever catches the signal
+            signal.__init__(self._buffer, self._rule_stack, item)
+        signal.__traceback__ = None
+        raise signal
 
     def _fail(self):
         self._error('fail')
@@ -445,148 +676,225 @@ class ParseContext(object):
             self._buffer.posline(endpos),
         )
 
-    def _call(self, rule, name, params, kwparams):
-        self._rule_stack.append(name)
+    def _call(self, rule, name, params, kwparams, memoize=True):
+        return self._call_rule(RuleInfo.new(rule, name, params, kwparams, memoize))
+
+    def _call_rule(self, ruleinfo):
+        name = ruleinfo.name
+        self._rule_stack = self._rule_stack.push(name)
         pos = self._pos
+        profile = self._profile
+        if profile is not None:
+            profile.enter(name)
         try:
-            self._trace_entry()
+            if self._tracing:
+                self._trace_entry()
 
             self._last_node = None
 
-            node, newpos, newstate = self._invoke_rule(rule, name, params, kwparams)
+            node, newpos, newstate = self._invoke_rule(ruleinfo)
 
             self._goto(newpos)
             self._state = newstate
             self._add_cst_node(node)
             self._last_node = node
 
-            self._trace_success()
+            if self._tracing:
+                self._trace_success(pos)
+            if profile is not None:
+                profile.leave(name, pos, newpos)
             return node
         except FailedPattern:
+            if self._tracing:
+                self._trace_failure(pos)
+            if profile is not None:
+                profile.leave(name, pos, self._pos, failed=True)
             self._error('Expecting <%s>' % name)
         except FailedParse as e:
+            if profile is not None:
+                profile.leave(name, pos, self._pos, failed=True)
             self._goto(pos)
-            self._set_furthest_exception(e)
-            if isinstance(e, FailedLeftRecursion):
-                self._trace_recursion()
-            else:
-                self._trace_failure()
+            if not (self.left_recursion and isinstance(e, FailedLeftRecursion)):
+                # the seed of a left recursion is not what failed
+                self._set_furthest_exception(e)
+            if self._tracing:
+                if isinstance(e, FailedLeftRecursion):
+                    self._trace_recursion()
+                else:
+                    self._trace_failure()
             raise
         finally:
-            self._rule_stack.pop()
+            self._rule_stack = self._rule_stack.rest
 
-    def _invoke_rule(self, rule, name, params, kwparams):
-        cache = self._memoization_cache
-        if name[0].islower():
+    def _invoke_rule(self, ruleinfo):
+        if not ruleinfo.is_lexical:
             self._next_token()
         pos = self._pos
+        if self._invocations is not None:
+            self._record_invocation(ruleinfo.name, pos)
+
+        if not ruleinfo.is_memo:
+            try:
+                return self._eval_rule(ruleinfo, pos)
+            except FailedParse as e:
+                self._set_furthest_exception(e)
+                raise
 
-        key = (pos, rule, self._state)
-        if key in cache:
-            memo = cache[key]
-            memo = self._left_recursion_check(name, key, memo)
-            if isinstance(memo, Exception):
-                raise memo
-            return memo
+        name = ruleinfo.name
+        cache = self._memoization_cache
+        key = memo_key(name, self._state)
+
+        head = self._recursion_heads.get(pos)
+        if head is not None and key in head.evaluating:
+            # rules involved in a left recursion are evaluated once
+            # again on each iteration of its growth
+            head.evaluating.remove(key)
+            guard = None
+        else:
+            memo = cache.get(pos, key)
+            if self._profile is not None:
+                self._profile.memo(name, memo is not None)
+            if memo is not None:
+                memo = self._left_recursion_check(name, pos, key, memo)
+                if isinstance(memo, Exception):
+                    raise memo
+                return memo
+
+            guard = None
+            if self._needs_left_recursion_guard(name):
+                guard = self._set_left_recursion_guard(name, pos, key)
 
-        self._set_left_recursion_guard(name, key)
-        self._push_ast()
+        try:
+            result = self._eval_rule(ruleinfo, pos)
+        except FailedParse as e:
+            self._set_furthest_exception(e)
+            result = self._detached_failure(e)
+        finally:
+            if guard is not None:
+                self._recursion_stack = guard.next
+
+        if guard is not None and guard.head is not None:
+            result = self._left_recurse(ruleinfo, pos, key, guard, result)
+        elif self._memoization():
+            cache.set(pos, key, result)
+
+        if isinstance(result, Exception):
+            raise result
+        return result
+
+    def _eval_rule(self, ruleinfo, pos):
+        # the same as _push_ast() and _pop_ast(), inlined
+        ast_stack = self._ast_stack
+        concrete_stack = self._concrete_stack
+        concrete_stack.append(None)
+        ast_stack.append(AST())
         try:
             try:
-                rule(self)
+                ruleinfo.impl(self)
 
-                node = self.ast
+                node = ast_stack[-1]
                 if not node:
-                    node = self.cst
+                    node = concrete_stack[-1]
                 elif '@' in node:
                     node = node['@']  # override the AST
                 elif self.parseinfo:
-                    node.set_parseinfo(self._get_parseinfo(name, pos))
-
-                node = self._invoke_semantic_rule(name, node, params, kwparams)
-                result = (node, self._pos, self._state)
-
-                result = self._left_recurse(rule, name, pos, key, result, params, kwparams)
+                    node.set_parseinfo(self._get_parseinfo(ruleinfo.name, pos))
 
-                if self._memoization() and not self._in_recursive_loop():
-                    cache[key] = result
-                return result
+                node = self._invoke_semantic_rule(ruleinfo.name, node, ruleinfo.params, ruleinfo.kwparams)
+                return (node, self._pos, self._state)
             except FailedSemantics as e:
                 self._error(ustr(e), FailedParse)
-        except FailedParse as e:
-            self._set_furthest_exception(e)
-            if self._memoization():
-                cache[key] = e
-            raise
         finally:
-            self._pop_ast()
+            ast_stack.pop()
+            concrete_stack.pop()
 
-    def _set_left_recursion_guard(self, name, key):
-        exception = FailedLeftRecursion(
-            self._buffer,
-            list(reversed(self._rule_stack[:])),
-            name
-        )
+    def _needs_left_recursion_guard(self, name):
+        rules = self.left_recursive_rules
+        return rules is None or name in rules
 
+    def _set_left_recursion_guard(self, name, pos, key):
         # Alessandro Warth et al say that we can deal with
         # direct and indirect left-recursion by seeding the
         # memoization cache with a parse failure.
         #
         #   http://www.vpri.org/pdf/tr2007002_packrat.pdf
         #
-        if self._memoization():
-            self._memoization_cache[key] = exception
-
-    def _left_recursion_check(self, name, key, memo):
-        if isinstance(memo, FailedLeftRecursion) and self.left_recursion:
-            # At this point we know we've already seen this rule
-            # at this position. Either we've got a potential
-            # result from a previous pass that we can return, or
-            # we make a note of the rule so that we can take
-            # action as we unwind the rule stack.
-
-            if key in self._recursive_results:
-                memo = self._recursive_results[key]
-            else:
-                self._recursive_head.append(name)
+        if not self._memoization():
+            return None
+        if not self.left_recursion:
+            # The same failure is used for every rule and position,
+            # and the exception is built only if the guard is hit.
+            self._memoization_cache.set(pos, key, self._left_recursion_guard)
+            return None
+
+        guard = LeftRecursion(key, self._recursion_stack)
+        self._recursion_stack = guard
+        self._memoization_cache.set(pos, key, guard)
+        return guard
+
+    def _left_recursion_check(self, name, pos, key, memo):
+        if isinstance(memo, LeftRecursion):
+            # At this point we know we've already seen this rule at
+            # this position. The rules invoked since are involved in
+            # a left recursion, and the answer is the seed.
+            self._setup_left_recursion(memo)
+            memo = memo.seed
+            if memo is None:
+                memo = FailedLeftRecursion(self._buffer, self._rule_stack, name)
+        elif memo is self._left_recursion_guard:
+            memo = FailedLeftRecursion(self._buffer, self._rule_stack, name)
         return memo
 
-    def _in_recursive_loop(self):
-        head = self._recursive_head
-        return head and head[-1] in self._rule_stack
+    def _setup_left_recursion(self, guard):
+        if guard.head is None:
+            guard.head = RecursionHead(guard.key)
+        head = guard.head
+        entry = self._recursion_stack
+        while entry is not None and entry.head is not head:
+            entry.head = head
+            head.involved.add(entry.key)
+            entry = entry.next
+
+    def _left_recurse(self, ruleinfo, pos, key, guard, result):
+        head = guard.head
+        if head.key != key:
+            # not the rule at which the recursion started
+            guard.seed = result
+            return result
 
-    def _left_recurse(self, rule, name, pos, key, result, params, kwparams):
-        if self._memoization():
-            self._recursive_results[key] = result
+        cache = self._memoization_cache
+        cache.set(pos, key, result)
+        if not isinstance(result, Exception):
+            result = self._grow_left_recursion(ruleinfo, pos, key, head, result)
+
+        # the involved rules that were not evaluated again keep their seeds
+        for involved in head.involved:
+            memo = cache.get(pos, involved)
+            if isinstance(memo, LeftRecursion):
+                cache.set(pos, involved, memo.seed)
+        return result
 
-        # If the current name is in the head, then we've just
-        # unwound to the highest rule in the recursion
+    def _grow_left_recursion(self, ruleinfo, pos, key, head, result):
+        # Repeatedly apply the rule while it consumes more input,
+        # evaluating again only the rules involved in the recursion.
         cache = self._memoization_cache
-        last_pos = pos
-        if (
-            [name] == self._recursive_head[-1:] and
-            self._recursive_head[-1:] != self._recursive_eval[-1:]
-        ):
-            # Repeatedly apply the rule until it can't consume any
-            # more. We store the last good result each time. Prior
-            # to doing so we reset the position and remove any
-            # failures from the cache.
-            last_result = result
-            self._recursive_eval.append(name)
-            while self._pos > last_pos:
-                last_result = result
-                last_pos = self._pos
+        state = self._state
+        self._recursion_heads[pos] = head
+        try:
+            while True:
                 self._goto(pos)
-                prune_dict(cache, lambda _, v: isinstance(v, FailedParse))
+                self._state = state
+                head.evaluating = set(head.involved)
                 try:
-                    result = self._invoke_rule(rule, name, params, kwparams)
+                    grown = self._eval_rule(ruleinfo, pos)
                 except FailedParse:
-                    pass
-
-            result = last_result
-            self._recursive_results = dict()
-            self._recursive_head.pop()
-            self._recursive_eval.pop()
+                    break
+                if grown[1] <= result[1]:
+                    break
+                result = grown
+                cache.set(pos, key, result)
+        finally:
+            del self._recursion_heads[pos]
         return result
 
     def _invoke_semantic_rule(self, name, node, params, kwparams):
@@ -600,16 +908,33 @@ class ParseContext(object):
     def _token(self, token):
         self._next_token()
         if self._buffer.match(token) is None:
-            self._trace_match(token, failed=True)
+            if self._tracing:
+                self._trace_match(token, failed=True)
             self._error(token, etype=FailedToken)
-        self._trace_match(token)
+        if self._tracing:
+            self._trace_match(token)
+        self._add_cst_node(token)
+        self._last_node = token
+        return token
+
+    def _token_choice(self, tokens, error='no available options'):
+        # a choice of plain tokens, matched with a single regex
+        self._next_token()
+        token = self._buffer.match_any(tokens)
+        if token is None:
+            if self._tracing:
+                self._trace_match('|'.join(tokens), failed=True)
+            self._error(error)
+        if self._tracing:
+            self._trace_match(token)
         self._add_cst_node(token)
         self._last_node = token
         return token
 
     def _constant(self, literal):
         self._next_token()
-        self._trace_match(literal)
+        if self._tracing:
+            self._trace_constant(literal)
         self._add_cst_node(literal)
         self._last_node = literal
         return literal
@@ -617,9 +942,13 @@ class ParseContext(object):
     def _pattern(self, pattern):
         token = self._buffer.matchre(pattern)
         if token is None:
-            self._trace_match('', pattern, failed=True)
+            # generated parsers and models pass compiled patterns
+            pattern = getattr(pattern, 'pattern', pattern)
+            if self._tracing:
+                self._trace_match('', pattern, failed=True)
             self._error(pattern, etype=FailedPattern)
-        self._trace_match(token, pattern)
+        if self._tracing:
+            self._trace_match(token, getattr(pattern, 'pattern', pattern))
         self._add_cst_node(token)
         self._last_node = token
         return token
@@ -639,21 +968,23 @@ class ParseContext(object):
     def _try(self):
         p = self._pos
         s = self._state
-        ast_copy = self.ast.copy()
-        self._push_ast()
+        ast = self.ast
+        mark = ast._mark()
+        self._push_cst()
         self.last_node = None
         try:
-            self.ast = ast_copy
             yield
-            ast = self.ast
             cst = self.cst
         except:
+            if self._profile is not None:
+                self._profile.rewind(self._rule_stack.top, self._pos - p)
             self._goto(p)
             self._state = s
+            ast._rollback(mark)
             raise
         finally:
-            self._pop_ast()
-        self.ast = ast
+            self._pop_cst()
+        ast._release(mark)
         self._extend_cst(cst)
         self.last_node = cst
 
@@ -669,7 +1000,7 @@ class ParseContext(object):
             raise
         except FailedParse as e:
             if self._is_cut_set():
-                raise FailedCut(e)
+                raise FailedCut(self._detached_failure(e))
         finally:
             self._pop_cut()
 
@@ -754,7 +1085,7 @@ class ParseContext(object):
                 raise
             except FailedParse as e:
                 if self._is_cut_set():
-                    raise FailedCut(e)
+                    raise FailedCut(self._detached_failure(e))
                 break
             finally:
                 self._pop_cut()
@@ -766,6 +1097,8 @@ class ParseContext(object):
             with self._optional():
                 with self._try():
                     block()
+                # failures in the repeats don't go back to the start
+                self._cut_stack[-1] = True
                 self.cst = [self.cst]
                 self._repeater(block, prefix=sep, omitprefix=omitsep)
             cst = Closure(self.cst)
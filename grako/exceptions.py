@@ -57,6 +57,18 @@ class FailedParse(ParseError):
         self.pos = buf.pos
         self.item = item
 
+    @property
+    def stack(self):
+        # the rule stack may be given as any iterable, innermost rule
+        # first, and it is copied into a list only when needed
+        if not isinstance(self._stack, list):
+            self._stack = list(self._stack)
+        return self._stack
+
+    @stack.setter
+    def stack(self, value):
+        self._stack = value
+
     @property
     def message(self):
         return self.item
@@ -120,7 +132,7 @@ class FailedRef(FailedParse):
 
 class FailedCut(FailedParse):
     def __init__(self, nested):
-        super(FailedCut, self).__init__(nested.buf, nested.stack, nested.item)
+        super(FailedCut, self).__init__(nested.buf, nested._stack, nested.item)
         self.pos = nested.pos
         self.nested = nested
 
@@ -13,9 +13,11 @@ from grako.util import indent, trim, ustr, urepr, strtype, compress_seq, chunks
 from grako.util import re, RE_FLAGS
 from grako.exceptions import FailedRef, GrammarError
 from grako.ast import AST
+from grako.infos import RuleInfo
 from grako.contexts import ParseContext
 from grako.objectmodel import Node
 from grako.bootstrap import EBNFBootstrapBuffer
+from grako.buffering import compiled_regex
 
 
 PEP8_LLEN = 72
@@ -25,6 +27,9 @@ COMMENTS_RE = r'\(\*((?:.|\n)*?)\*\)'
 EOL_COMMENTS_RE = r'#([^\n]*?)$'
 PRAGMA_RE = r'^\s*#[a-z]+'
 
+# regex constructs that may match the empty string at some positions only
+ZERO_WIDTH_RE = re.compile(r'\(\?[=!<]|\\[bBAZ]|(?<!\[)\^|\$')
+
 
 def dot(x, y, k):
     return set([(a + b)[:k] for a in x for b in y])
@@ -34,6 +39,19 @@ def pythonize_name(name):
     return ''.join('_' + c.lower() if c.isupper() else c for c in name)
 
 
+def leftrefs_closure(refs, leads):
+    return set(refs).union(*[leads[r] for r in refs])
+
+
+def sequence_leftrefs(sequence, nullables):
+    result = set()
+    for s in sequence:
+        result |= s._leftrefs(nullables)
+        if not s._nullable(nullables):
+            break
+    return result
+
+
 class EBNFBuffer(EBNFBootstrapBuffer):
     def __init__(self, text, filename=None, comments_re=None, eol_comments_re=None, **kwargs):
         super(EBNFBuffer, self).__init__(
@@ -78,6 +96,7 @@ class ModelContext(ParseContext):
             **kwargs
         )
         self.rules = {rule.name: rule for rule in rules}
+        self.left_recursive_rules = {rule.name for rule in rules if rule.is_leftrec}
 
     @property
     def pos(self):
@@ -137,6 +156,19 @@ class Model(Node):
     def _follow(self, k, fl, a):
         return a
 
+    def _nullable(self, nullables):
+        return True
+
+    def _leftrefs(self, nullables):
+        return set()
+
+    def _shared_refs(self, nullables, leads):
+        return set()
+
+    def _start_chars(self, chars, nullables):
+        # None means that the element may start with any character
+        return None
+
     def comments_str(self):
         comments, eol = self.comments
         if not comments:
@@ -167,11 +199,17 @@ class Model(Node):
 
 
 class Void(Model):
+    def _start_chars(self, chars, nullables):
+        return set()
+
     def _to_str(self, lean=False):
         return '()'
 
 
 class Fail(Model):
+    def _nullable(self, nullables):
+        return False
+
     def _to_str(self, lean=False):
         return '!()'
 
@@ -225,6 +263,18 @@ class Decorator(Model):
     def _follow(self, k, fl, a):
         return self.exp._follow(k, fl, a)
 
+    def _nullable(self, nullables):
+        return self.exp._nullable(nullables)
+
+    def _leftrefs(self, nullables):
+        return self.exp._leftrefs(nullables)
+
+    def _shared_refs(self, nullables, leads):
+        return self.exp._shared_refs(nullables, leads)
+
+    def _start_chars(self, chars, nullables):
+        return self.exp._start_chars(chars, nullables)
+
     def nodecount(self):
         return 1 + self.exp.nodecount()
 
@@ -261,6 +311,16 @@ class Token(Model):
     def _first(self, k, f):
         return set([(self.token,)])
 
+    def _nullable(self, nullables):
+        return not self.token
+
+    def _start_chars(self, chars, nullables):
+        if not self.token:
+            return None
+        c = self.token[0]
+        # ParseContext._lookahead_char() folds case if ignorecase is set
+        return {c, c.lower()[:1]}
+
     def _to_str(self, lean=False):
         return urepr(self.token)
 
@@ -273,6 +333,9 @@ class Constant(Model):
     def parse(self, ctx):
         return self.literal
 
+    def _start_chars(self, chars, nullables):
+        return set()
+
     def _to_str(self, lean=False):
         return '`%s`' % urepr(self.literal)
 
@@ -283,18 +346,29 @@ class Pattern(Model):
         if not isinstance(ast, list):
             ast = [ast]
         self.patterns = ast
-        re.compile(self.pattern, RE_FLAGS)
+        self._regex = compiled_regex(self.pattern, RE_FLAGS)
 
     @property
     def pattern(self):
         return ''.join(self.patterns)
 
+    @property
+    def regex(self):
+        return self._regex
+
     def parse(self, ctx):
-        return ctx._pattern(self.pattern)
+        return ctx._pattern(self._regex)
 
     def _first(self, k, f):
         return set([(self.pattern,)])
 
+    def _nullable(self, nullables):
+        # conservative, as it affects the detection of left recursion
+        return (
+            re.match(self.pattern, '', RE_FLAGS) is not None or
+            ZERO_WIDTH_RE.search(self.pattern) is not None
+        )
+
     def _to_str(self, lean=False):
         parts = []
         for pat in (ustr(p) for p in self.patterns):
@@ -311,6 +385,13 @@ class Lookahead(Decorator):
         with ctx._if():
             super(Lookahead, self).parse(ctx)
 
+    def _nullable(self, nullables):
+        return True
+
+    def _start_chars(self, chars, nullables):
+        self.exp._start_chars(chars, nullables)
+        return set()
+
     def _to_str(self, lean=False):
         return '&' + self.exp._to_ustr(lean=lean)
 
@@ -323,6 +404,13 @@ class NegativeLookahead(Decorator):
         with ctx._ifnot():
             super(NegativeLookahead, self).parse(ctx)
 
+    def _nullable(self, nullables):
+        return True
+
+    def _start_chars(self, chars, nullables):
+        self.exp._start_chars(chars, nullables)
+        return set()
+
 
 class Sequence(Model):
     def __init__(self, ast, **kwargs):
@@ -354,6 +442,34 @@ class Sequence(Model):
             fs = dot(x.firstset, fs, k)
         return a
 
+    def _nullable(self, nullables):
+        return all(s._nullable(nullables) for s in self.sequence)
+
+    def _leftrefs(self, nullables):
+        return sequence_leftrefs(self.sequence, nullables)
+
+    def _shared_refs(self, nullables, leads):
+        result = set().union(*[s._shared_refs(nullables, leads) for s in self.sequence])
+        # a lookahead invokes rules at the same position as what follows it
+        for i, s in enumerate(self.sequence):
+            if isinstance(s, (Lookahead, NegativeLookahead)):
+                ahead = leftrefs_closure(s._leftrefs(nullables), leads)
+                rest = sequence_leftrefs(self.sequence[i + 1:], nullables)
+                result |= ahead & leftrefs_closure(rest, leads)
+        return result
+
+    def _start_chars(self, chars, nullables):
+        result = set()
+        starts = [s._start_chars(chars, nullables) for s in self.sequence]
+        for s, start in zip(self.sequence, starts):
+            if start is None:
+                return None
+            result |= start
+            if not s._nullable(nullables):
+                return result
+        # the sequence may succeed without consuming input
+        return None
+
     def nodecount(self):
         return 1 + sum(s.nodecount() for s in self.sequence)
 
@@ -371,18 +487,49 @@ class Choice(Model):
     def __init__(self, ast=None, **kwargs):
         super(Choice, self).__init__(ast=AST(options=ast))
         assert isinstance(self.options, list), urepr(self.options)
+        self._option_chars = None
+        self._option_refs = None
+        self._tokens = self._plain_tokens()
+        self._tokens_error = None
+
+    def _plain_tokens(self):
+        tokens = []
+        for o in self.options:
+            if isinstance(o, Sequence) and len(o.sequence) == 1:
+                o = o.sequence[0]
+            if type(o) is not Token or not o.token:
+                return None
+            tokens.append(o.token)
+        return tuple(tokens)
+
+    @property
+    def tokens(self):
+        """
+        The tokens of a choice in which every option is a single token,
+        or None. Such a choice is matched in one step by
+        `ParseContext._token_choice()`.
+        """
+        return self._tokens
+
+    def _error_message(self):
+        lookahead = ' '.join(ustr(urepr(f[0])) for f in self.lookahead if str(f))
+        if lookahead:
+            return 'expecting one of {%s}' % lookahead
+        return 'no available options'
 
     def parse(self, ctx):
+        if self._tokens:
+            if self._tokens_error is None:
+                self._tokens_error = self._error_message()
+            return ctx._token_choice(self._tokens, self._tokens_error)
+
         with ctx._choice():
             for o in self.options:
                 with ctx._option():
                     ctx.last_node = o.parse(ctx)
                     return ctx.last_node
 
-            lookahead = ' '.join(ustr(urepr(f[0])) for f in self.lookahead if str(f))
-            if lookahead:
-                ctx._error('expecting one of {%s}' % lookahead)
-            ctx._error('no available options')
+            ctx._error(self._error_message())
 
     def defines(self):
         return [d for o in self.options for d in o.defines()]
@@ -401,6 +548,49 @@ class Choice(Model):
             o._follow(k, fl, a)
         return a
 
+    def _nullable(self, nullables):
+        return any(o._nullable(nullables) for o in self.options)
+
+    def _leftrefs(self, nullables):
+        return set().union(*[o._leftrefs(nullables) for o in self.options])
+
+    def _shared_refs(self, nullables, leads):
+        # rules that more than one option may invoke at the same position
+        result = set()
+        seen = set()
+        for o in self.options:
+            refs = leftrefs_closure(o._leftrefs(nullables), leads)
+            result |= seen & refs
+            seen |= refs
+        return result.union(*[o._shared_refs(nullables, leads) for o in self.options])
+
+    def _start_chars(self, chars, nullables):
+        starts = [o._start_chars(chars, nullables) for o in self.options]
+        self._option_chars = [
+            None if o._nullable(nullables) else start
+            for o, start in zip(self.options, starts)
+        ]
+        self._option_refs = [bool(o._leftrefs(nullables)) for o in self.options]
+        if None in self._option_chars:
+            return None
+        return set().union(*self._option_chars)
+
+    @property
+    def option_chars(self):
+        """
+        For each option, the set of characters the next token must start
+        with for the option to succeed, or None if it could be any.
+        """
+        return self._option_chars
+
+    @property
+    def option_refs(self):
+        """
+        For each option, if it invokes rules before its first token, so
+        skipping it may change the failures recorded for error reports.
+        """
+        return self._option_refs
+
     def nodecount(self):
         return 1 + sum(o.nodecount() for o in self.options)
 
@@ -429,6 +619,9 @@ class Closure(Decorator):
             result = dot(result, efirst, k)
         return {()} | result
 
+    def _nullable(self, nullables):
+        return True
+
     def _to_str(self, lean=False):
         sexp = ustr(self.exp._to_str(lean=lean))
         if len(sexp.splitlines()) <= 1:
@@ -448,6 +641,9 @@ class PositiveClosure(Closure):
             result = dot(result, efirst, k)
         return result
 
+    def _nullable(self, nullables):
+        return self.exp._nullable(nullables)
+
     def _to_str(self, lean=False):
         return super(PositiveClosure, self)._to_str(lean=lean) + '+'
 
@@ -471,6 +667,19 @@ class Join(Decorator):
     def _do_parse(self, ctx, exp, sep):
         return ctx._join(exp, sep)
 
+    def _nullable(self, nullables):
+        return True
+
+    def _shared_refs(self, nullables, leads):
+        return (
+            self.exp._shared_refs(nullables, leads) |
+            self.sep._shared_refs(nullables, leads)
+        )
+
+    def _start_chars(self, chars, nullables):
+        self.sep._start_chars(chars, nullables)
+        return self.exp._start_chars(chars, nullables)
+
     def _to_str(self, lean=False):
         ssep = self.sep._to_str(lean=lean)
         sexp = ustr(self.exp._to_str(lean=lean))
@@ -484,6 +693,9 @@ class PositiveJoin(Join):
     def _do_parse(self, ctx, exp, sep):
         return ctx._positive_join(exp, sep)
 
+    def _nullable(self, nullables):
+        return self.exp._nullable(nullables)
+
     def _to_str(self, lean=False):
         return super(PositiveJoin, self)._to_str(lean=lean) + '+'
 
@@ -513,6 +725,9 @@ class PositiveGather(Gather):
     def _do_parse(self, ctx, exp, sep):
         return ctx._positive_gather(exp, sep)
 
+    def _nullable(self, nullables):
+        return self.exp._nullable(nullables)
+
     def _to_str(self, lean=False):
         return super(PositiveGather, self)._to_str(lean=lean) + '+'
 
@@ -521,6 +736,9 @@ class EmptyClosure(Model):
     def parse(self, ctx):
         return ctx._empty_closure()
 
+    def _start_chars(self, chars, nullables):
+        return set()
+
     def _to_str(self, lean=False):
         return '{}'
 
@@ -534,6 +752,9 @@ class Optional(Decorator):
     def _first(self, k, f):
         return {()} | self.exp._first(k, f)
 
+    def _nullable(self, nullables):
+        return True
+
     def _to_str(self, lean=False):
         exp = ustr(self.exp._to_str(lean=lean))
         template = '[%s]'
@@ -558,6 +779,9 @@ class Cut(Model):
     def _first(self, k, f):
         return {('~',)}
 
+    def _start_chars(self, chars, nullables):
+        return set()
+
     def _to_str(self, lean=False):
         return '~'
 
@@ -616,6 +840,9 @@ class Special(Model):
     def _first(self, k, f):
         return set([(self.value,)])
 
+    def _nullable(self, nullables):
+        return False
+
     def _to_str(self, lean=False):
         return '?%s?' % self.value
 
@@ -638,6 +865,18 @@ class RuleRef(Model):
             return {self.name}
         return set()
 
+    def _nullable(self, nullables):
+        return self.name in nullables
+
+    def _leftrefs(self, nullables):
+        return {self.name}
+
+    def _start_chars(self, chars, nullables):
+        # only rules with lowercase names skip whitespace before parsing
+        if not self.name[0].islower():
+            return None
+        return chars.get(self.name)
+
     def _first(self, k, f):
         self._first_set = f.get(self.name, set())
         return self._first_set
@@ -673,8 +912,13 @@ class Rule(Decorator):
         self._adopt_children([params, kwparams])
 
         self.is_name = 'name' in self.decorators
+        self.is_memo = 'nomemo' not in self.decorators
+        self.is_leftrec = False
         self.base = None
 
+        self._ruleinfo = None
+        self._defines = None
+
     def parse(self, ctx):
         result = self._parse_rhs(ctx, self.exp)
         if self.is_name:
@@ -682,13 +926,17 @@ class Rule(Decorator):
         return result
 
     def _parse_rhs(self, ctx, exp):
-        result = ctx._call(exp.parse, self.name, self.params, self.kwparams)
+        if self._ruleinfo is None:
+            self._ruleinfo = RuleInfo.new(exp.parse, self.name, self.params, self.kwparams, self.is_memo)
+        result = ctx._call_rule(self._ruleinfo)
         if isinstance(result, AST):
-            defines = compress_seq(self.defines())
-            result._define(
-                [d for d, l in defines if not l],
-                [d for d, l in defines if l]
-            )
+            if self._defines is None:
+                defines = compress_seq(self.defines())
+                self._defines = (
+                    tuple(d for d, l in defines if not l),
+                    tuple(d for d, l in defines if l)
+                )
+            result._define(*self._defines)
         return result
 
     def _first(self, k, f):
@@ -743,10 +991,11 @@ class Rule(Decorator):
             exp=indent(self.exp._to_str(lean=lean)),
             comments=comments,
             is_name='@name\n' if self.is_name else '',
+            nomemo='@nomemo\n' if 'nomemo' in self.decorators else '',
         )
 
     str_template = '''\
-                {is_name}{comments}{name}{base}{params}
+                {is_name}{nomemo}{comments}{name}{base}{params}
                     =
                 {exp}
                     ;
@@ -774,6 +1023,18 @@ class BasedRule(Rule):
     def defines(self):
         return self.rhs.defines()
 
+    def _nullable(self, nullables):
+        return self.rhs._nullable(nullables)
+
+    def _leftrefs(self, nullables):
+        return self.rhs._leftrefs(nullables)
+
+    def _shared_refs(self, nullables, leads):
+        return self.rhs._shared_refs(nullables, leads)
+
+    def _start_chars(self, chars, nullables):
+        return self.rhs._start_chars(chars, nullables)
+
 
 class Grammar(Model):
     def __init__(self,
@@ -837,6 +1098,10 @@ class Grammar(Model):
 
         self._calc_lookahead_sets()
 
+        nullables = self._calc_nullables()
+        self._calc_memoization(nullables)
+        self._calc_start_chars(nullables)
+
     def _missing_rules(self, ruleset):
         return set().union(*[rule._missing_rules(ruleset) for rule in self.rules])
 
@@ -870,6 +1135,60 @@ class Grammar(Model):
         for rule in self.rules:
             rule._follow_set = fl[rule.name]
 
+    def _calc_nullables(self):
+        nullables = set()
+        while True:
+            found = {rule.name for rule in self.rules if rule._nullable(nullables)}
+            if found <= nullables:
+                return nullables
+            nullables |= found
+
+    def _calc_leads(self, nullables):
+        leftrefs = {rule.name: rule._leftrefs(nullables) for rule in self.rules}
+        leads = {}
+        for name in leftrefs:
+            lead = set()
+            pending = list(leftrefs[name])
+            while pending:
+                ref = pending.pop()
+                if ref not in lead:
+                    lead.add(ref)
+                    pending.extend(leftrefs[ref])
+            leads[name] = lead
+        return leads
+
+    def _calc_memoization(self, nullables):
+        leads = self._calc_leads(nullables)
+        for rule in self.rules:
+            rule.is_leftrec = rule.name in leads[rule.name]
+
+        memoize = self.directives.get('memoize', True)
+        if memoize == 'auto':
+            shared = set().union(*[rule._shared_refs(nullables, leads) for rule in self.rules])
+            for rule in self.rules:
+                # rules that don't invoke other rules are cheaper to reparse
+                trivial = not rule._missing_rules(set())
+                rule.is_memo = (
+                    'nomemo' not in rule.decorators and
+                    rule.name in shared and
+                    not trivial
+                )
+        elif not memoize:
+            for rule in self.rules:
+                rule.is_memo = False
+
+        for rule in self.rules:
+            # left recursion relies on the memoization cache
+            rule.is_memo = rule.is_memo or rule.is_leftrec
+
+    def _calc_start_chars(self, nullables):
+        chars = {rule.name: set() for rule in self.rules}
+        chars1 = None
+        while chars1 != chars:
+            chars1 = copy(chars)
+            for rule in self.rules:
+                chars[rule.name] = rule._start_chars(chars1, nullables)
+
     def parse(self,
               text,
               rule_name=None,
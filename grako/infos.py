@@ -3,27 +3,30 @@
 # Copyright (C) 2012-2016 by Juancarlo Añez and Thomas Bragg
 from __future__ import absolute_import, division, print_function, unicode_literals
 
+from array import array
 from collections import namedtuple
+from itertools import chain
+
+from grako.util import accumulate, imap
 
 
 class PosLine(namedtuple('_PosLine', ['start', 'line', 'length'])):
     __slots__ = ()
 
     @staticmethod
-    def build_line_cache(lines):
-        cache = []
-        n = 0
-        i = 0
-        for n, line in enumerate(lines):
-            pl = PosLine(i, n, len(line))
-            for c in line:
-                cache.append(pl)
-            i += len(line)
-        n += 1
+    def build_line_starts(lines):
+        """
+        Return an array with the offset at which each line starts, followed
+        by the total length of the lines, and the count of lines.
+
+        The array takes O(lines) memory, and the containing line of any
+        position can be found with a `bisect` over it.
+        """
+        starts = array('q', accumulate(chain([0], imap(len, lines))))
+        n = max(1, len(lines))
         if lines and lines[-1] and lines[-1][-1] in '\r\n':
             n += 1
-        cache.append(PosLine(i, n, 0))
-        return cache, n
+        return starts, n
 
 
 class LineIndexInfo(namedtuple('_LineIndexInfoBase', ['filename', 'line'])):
@@ -67,3 +70,18 @@ class ParseInfo(_ParseInfo):
 
     def line_index(self):
         return self.buffer.line_index(self.line, self.endline)
+
+
+class RuleInfo(namedtuple('_RuleInfo', ['name', 'impl', 'params', 'kwparams', 'is_memo', 'is_lexical'])):
+    """
+    What the parser needs to know to invoke a rule, resolved once when
+    the rule is defined instead of on every invocation.
+
+    Lexical rules, those with names that don't start with a lowercase
+    letter, don't skip whitespace and comments before parsing.
+    """
+    __slots__ = ()
+
+    @staticmethod
+    def new(impl, name, params=None, kwparams=None, is_memo=True):
+        return RuleInfo(name, impl, params, kwparams, is_memo, not name[:1].islower())
@@ -0,0 +1,290 @@
+# -*- coding: utf-8 -*-
+# Copyright (C) 2017      by Juancarlo Añez
+# Copyright (C) 2012-2016 by Juancarlo Añez and Thomas Bragg
+"""
+Memoization tables for the results of rule invocations.
+
+Entries are grouped by input position so that dropping the entries
+before a cut costs time proportional to the number of entries dropped,
+instead of to the size of the table.
+"""
+from __future__ import absolute_import, division, print_function, unicode_literals
+
+import sys
+from collections import OrderedDict
+from heapq import heappush, heappop
+
+from grako.exceptions import FailedLeftRecursion
+
+
+def memo_key(name, state):
+    # rule names are interned strings with a cached hash
+    return name if state is None else (name, state)
+
+
+def new_memo_cache(limit=None, policy=None):
+    if limit is None:
+        return MemoCache()
+
+    policy = policy or 'lru'
+    if policy not in MEMO_POLICIES:
+        raise ValueError(
+            'unknown memo policy %s, expected one of: %s'
+            % (policy, ', '.join(sorted(MEMO_POLICIES)))
+        )
+    return MEMO_POLICIES[policy](limit)
+
+
+def render_heatmap(heat, width=50, out=sys.stdout):
+    """
+    Write the count of rule re-invocations by line, as given by
+    `ParseContext.memo_heat`, with a bar scaled to the hottest line.
+    """
+    if not heat:
+        return
+    hottest = max(heat.values())
+    for line in sorted(heat):
+        count = heat[line]
+        bar = '#' * max(1, width * count // hottest)
+        print('%6d %8d %s' % (line + 1, count, bar), file=out)
+
+
+class LeftRecursion(FailedLeftRecursion):
+    """
+    The memo entry for a rule invocation that is in progress, as used in
+    the left recursion algorithm of Warth et al:
+
+        http://www.vpri.org/pdf/tr2007002_packrat.pdf
+
+    It is a failure to the memoization cache, but it is never raised.
+    """
+    def __init__(self, key, next):
+        self.key = key
+        self.seed = None
+        self.head = None
+        self.next = next
+
+
+class RecursionHead(object):
+    """
+    The rule at which a left recursion starts, with the rules involved
+    in it, and those that remain to be evaluated in the current
+    iteration of its growth.
+    """
+    __slots__ = ('key', 'involved', 'evaluating')
+
+    def __init__(self, key):
+        self.key = key
+        self.involved = set()
+        self.evaluating = set()
+
+
+class MemoCache(object):
+    def __init__(self):
+        self._table = {}
+        self._positions = []
+        self._size = 0
+
+        self.hits = 0
+        self.misses = 0
+        self.stored = 0
+        self.pruned = 0
+        self.evictions = 0
+        self.rejected = 0
+        self.peak = 0
+
+    def __len__(self):
+        return self._size
+
+    def stats(self):
+        """
+        The current size of the cache, the entries stored, those reused
+        (hits), the lookups that found nothing (misses), the entries
+        dropped by cuts (pruned) or to bound the size (evictions), the
+        entries not stored because they were outside the bounds (rejected),
+        and the largest size reached (peak).
+        """
+        return dict(
+            size=self._size,
+            stored=self.stored,
+            hits=self.hits,
+            misses=self.misses,
+            pruned=self.pruned,
+            evictions=self.evictions,
+            rejected=self.rejected,
+            peak=self.peak,
+        )
+
+    def get(self, pos, key):
+        memos = self._table.get(pos)
+        if memos is not None:
+            value = memos.get(key)
+            if value is not None:
+                self.hits += 1
+                return value
+        self.misses += 1
+
+    def set(self, pos, key, value):
+        memos = self._table.get(pos)
+        if memos is None:
+            memos = self._table[pos] = {}
+            heappush(self._positions, pos)
+        if key not in memos:
+            self._size += 1
+            self.stored += 1
+            if self._size > self.peak:
+                self.peak = self._size
+        memos[key] = value
+
+    def __contains__(self, item):
+        pos, key = item
+        memos = self._table.get(pos)
+        return memos is not None and key in memos
+
+    def _remove(self, pos, key):
+        del self._table[pos][key]
+        self._size -= 1
+
+    def _drop(self, pos, memos):
+        self._size -= len(memos)
+
+    def prune(self, cutpos):
+        """ Remove all entries for positions before `cutpos`. """
+        positions = self._positions
+        while positions and positions[0] < cutpos:
+            pos = heappop(positions)
+            memos = self._table.pop(pos)
+            self.pruned += len(memos)
+            self._drop(pos, memos)
+
+    def prune_values(self, predicate):
+        """ Remove all entries for which predicate(value) is true. """
+        for pos, memos in self._table.items():
+            for key in [k for k, v in memos.items() if predicate(v)]:
+                self._remove(pos, key)
+
+    def clear(self):
+        self._table.clear()
+        del self._positions[:]
+        self._size = 0
+
+    def items(self):
+        for pos, memos in self._table.items():
+            for key, value in memos.items():
+                yield (pos, key), value
+
+
+class BoundedMemoCache(MemoCache):
+    """
+    Base for memo caches that evict entries to keep their size bounded.
+
+    The left recursion guards that `ParseContext` stores while a rule is
+    being parsed are never evicted, as losing them would allow infinite
+    recursion.
+    """
+    def __init__(self, limit):
+        super(BoundedMemoCache, self).__init__()
+        self.limit = limit
+
+    @staticmethod
+    def _is_pinned(value):
+        return isinstance(value, FailedLeftRecursion)
+
+
+class LRUMemoCache(BoundedMemoCache):
+    """
+    Keep at most `limit` entries, evicting the least recently used.
+    """
+    def __init__(self, limit):
+        super(LRUMemoCache, self).__init__(limit)
+        self._order = OrderedDict()
+
+    def get(self, pos, key):
+        value = super(LRUMemoCache, self).get(pos, key)
+        if value is not None:
+            self._order.move_to_end((pos, key))
+        return value
+
+    def set(self, pos, key, value):
+        super(LRUMemoCache, self).set(pos, key, value)
+        self._order[(pos, key)] = None
+        self._order.move_to_end((pos, key))
+        if self._size > self.limit:
+            self._evict()
+
+    def _evict(self):
+        order = self._order
+        pinned = []
+        while self._size > self.limit and order:
+            item = order.popitem(last=False)[0]
+            pos, key = item
+            if self._is_pinned(self._table[pos][key]):
+                pinned.append(item)
+                continue
+            super(LRUMemoCache, self)._remove(pos, key)
+            self.evictions += 1
+        for item in pinned:
+            order[item] = None
+
+    def _remove(self, pos, key):
+        super(LRUMemoCache, self)._remove(pos, key)
+        del self._order[(pos, key)]
+
+    def _drop(self, pos, memos):
+        super(LRUMemoCache, self)._drop(pos, memos)
+        for key in memos:
+            del self._order[(pos, key)]
+
+    def clear(self):
+        super(LRUMemoCache, self).clear()
+        self._order.clear()
+
+
+class WindowMemoCache(BoundedMemoCache):
+    """
+    Keep only the entries for the `limit` positions behind the furthest
+    position memoized so far.
+    """
+    def __init__(self, limit):
+        super(WindowMemoCache, self).__init__(limit)
+        self._furthest = 0
+
+    def set(self, pos, key, value):
+        self._furthest = max(self._furthest, pos)
+        threshold = self._furthest - self.limit
+        if pos < threshold and not self._is_pinned(value):
+            if (pos, key) in self:
+                # don't leave a stale left recursion guard behind
+                self._remove(pos, key)
+                self.evictions += 1
+            else:
+                self.rejected += 1
+            return
+
+        super(WindowMemoCache, self).set(pos, key, value)
+        self._slide(threshold)
+
+    def _slide(self, threshold):
+        positions = self._positions
+        pinned = []
+        while positions and positions[0] < threshold:
+            pos = heappop(positions)
+            memos = self._table.pop(pos)
+            kept = {k: v for k, v in memos.items() if self._is_pinned(v)}
+            self._size -= len(memos) - len(kept)
+            self.evictions += len(memos) - len(kept)
+            if kept:
+                pinned.append((pos, kept))
+        for pos, kept in pinned:
+            self._table[pos] = kept
+            heappush(positions, pos)
+
+    def clear(self):
+        super(WindowMemoCache, self).clear()
+        self._furthest = 0
+
+
+MEMO_POLICIES = {
+    'lru': LRUMemoCache,
+    'window': WindowMemoCache,
+}
@@ -4,7 +4,7 @@
 from __future__ import absolute_import, division, print_function, unicode_literals
 
 from grako.exceptions import FailedRef
-from grako.contexts import ParseContext, graken  # noqa
+from grako.contexts import ParseContext, graken, nomemo  # noqa
 
 
 class Parser(ParseContext):
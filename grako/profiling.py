@@ -0,0 +1,143 @@
+# -*- coding: utf-8 -*-
+# Copyright (C) 2017      by Juancarlo Añez
+# Copyright (C) 2012-2016 by Juancarlo Añez and Thomas Bragg
+"""
+Per-rule profiling of parses.
+
+A `ParseProfile` passed to a parser (`profile=`), or created by it with
+`profile=True`, counts the invocations of each rule, how many were
+answered from the memoization cache, how many succeeded or failed, the
+time spent in each rule and in the rules it invoked, and how much input
+the rule consumed, or gave back by backtracking. Rules with a large
+backtracking volume are good places for a cut.
+"""
+from __future__ import absolute_import, division, print_function, unicode_literals
+
+import json
+import sys
+from timeit import default_timer
+
+__all__ = ['RuleProfile', 'ParseProfile']
+
+
+class RuleProfile(object):
+    """
+    What was measured for a rule.
+
+    `time` is the cumulative time from entering the rule to leaving it,
+    counted once for recursive invocations, and `self_time` excludes the
+    time spent in the rules it invoked. `consumed` is the input consumed
+    by its successful invocations, and `rewound` the positions given back
+    when the rule, or an option within it, failed after advancing.
+    """
+    __slots__ = (
+        'name',
+        'calls',
+        'memo_hits',
+        'memo_misses',
+        'successes',
+        'failures',
+        'time',
+        'self_time',
+        'consumed',
+        'rewound',
+    )
+
+    FIELDS = __slots__
+
+    def __init__(self, name):
+        self.name = name
+        for field in self.FIELDS[1:]:
+            setattr(self, field, 0)
+
+    def asjson(self):
+        return {field: getattr(self, field) for field in self.FIELDS}
+
+
+class ParseProfile(object):
+    def __init__(self, timer=default_timer):
+        self.timer = timer
+        self.rules = {}
+        self._stack = []
+        self._active = {}
+
+    def start(self):
+        """ Forget the invocations in progress, as when a parse starts. """
+        del self._stack[:]
+        self._active.clear()
+
+    def _rule(self, name):
+        rule = self.rules.get(name)
+        if rule is None:
+            rule = self.rules[name] = RuleProfile(name)
+        return rule
+
+    def enter(self, name):
+        rule = self._rule(name)
+        rule.calls += 1
+        self._active[name] = self._active.get(name, 0) + 1
+        # [rule, start time, time spent in invoked rules]
+        self._stack.append([rule, self.timer(), 0.0])
+
+    def leave(self, name, pos, endpos, failed=False):
+        rule, start, inner = self._stack.pop()
+        elapsed = self.timer() - start
+        rule.self_time += elapsed - inner
+        if self._stack:
+            self._stack[-1][2] += elapsed
+
+        active = self._active[name] = self._active[name] - 1
+        if not active:
+            # a recursive invocation is included in the outermost one
+            rule.time += elapsed
+
+        if failed:
+            rule.failures += 1
+            self.rewind(name, endpos - pos)
+        else:
+            rule.successes += 1
+            rule.consumed += endpos - pos
+
+    def memo(self, name, hit):
+        rule = self._rule(name)
+        if hit:
+            rule.memo_hits += 1
+        else:
+            rule.memo_misses += 1
+
+    def rewind(self, name, count):
+        # backtracking outside of any rule isn't attributed
+        if count > 0 and name is not None:
+            self._rule(name).rewound += count
+
+    def sorted(self, key='self_time'):
+        return sorted(self.rules.values(), key=lambda r: getattr(r, key), reverse=True)
+
+    def asjson(self):
+        return [rule.asjson() for rule in self.sorted()]
+
+    def to_json(self, file=None):
+        result = json.dumps(self.asjson(), indent=2)
+        if file is not None:
+            file.write(result)
+            file.write('\n')
+        return result
+
+    def report(self, key='self_time', out=sys.stdout):
+        """ Write a table of the rules, the costliest first. """
+        header = (
+            'rule', 'calls', 'hits', 'misses', 'ok', 'failed',
+            'time', 'self', 'consumed', 'rewound',
+        )
+        print('%-24s %9s %9s %9s %9s %9s %10s %10s %10s %10s' % header, file=out)
+        for r in self.sorted(key):
+            print(
+                '%-24s %9d %9d %9d %9d %9d %10.4f %10.4f %10d %10d'
+                %
+                (
+                    r.name, r.calls, r.memo_hits, r.memo_misses,
+                    r.successes, r.failures, r.time, r.self_time,
+                    r.consumed, r.rewound,
+                ),
+                file=out
+            )
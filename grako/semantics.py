@@ -48,12 +48,15 @@ class ModelBuilderSemantics(object):
         self.base_type = base_type
 
         self.constructors = dict()
+        # the constructor for each type specification, resolved once
+        self._typespecs = dict()
 
         for t in types or ():
             self._register_constructor(t)
 
     def _register_constructor(self, constructor):
         self.constructors[constructor.__name__] = constructor
+        self._typespecs.clear()
         return constructor
 
     def _find_existing_constructor(self, typename):
@@ -86,11 +89,12 @@ class ModelBuilderSemantics(object):
 
         return self._register_constructor(constructor)
 
-    def _default(self, ast, *args, **kwargs):
-        if not args:
-            return ast
+    def _typespec_constructor(self, spec):
+        result = self._typespecs.get(spec)
+        if result is not None:
+            return result
 
-        typespec = args[0].split(BASE_CLASS_TOKEN)
+        typespec = spec.split(BASE_CLASS_TOKEN)
         typename = typespec[0]
         bases = typespec[1:]
 
@@ -99,6 +103,14 @@ class ModelBuilderSemantics(object):
             base = self._get_constructor(bases[0], base)
 
         constructor = self._get_constructor(typename, base)
+        result = self._typespecs[spec] = (typename, constructor)
+        return result
+
+    def _default(self, ast, *args, **kwargs):
+        if not args:
+            return ast
+
+        typename, constructor = self._typespec_constructor(args[0])
         try:
             if type(constructor) is type and issubclass(constructor, Node):
                 return constructor(*args[1:], ast=ast, ctx=self.ctx, **kwargs)
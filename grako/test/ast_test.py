@@ -48,6 +48,49 @@ class ASTTests(unittest.TestCase):
         self.assertEqual(['name', 'value'], list(ast))
         self.assertEqual([['hello', 'world'], 1], list(ast.values()))
 
+    def test_safekey(self):
+        ast = AST()
+        ast['items'] = 1
+        ast['_journal'] = 2
+        ast['name'] = 3
+        self.assertEqual(['items_', '_journal_', 'name'], list(ast))
+        self.assertEqual(1, ast['items'])
+        self.assertEqual(1, ast.items_)
+        self.assertRaises(AttributeError, setattr, ast, 'name', 4)
+
+    def test_rollback(self):
+        ast = AST()
+        ast['name'] = 'hello'
+        ast['list'] = 'a'
+        ast._define(['empty'], ['names'])
+        before = list(ast.items())
+
+        outer = ast._mark()
+        ast['list'] = 'b'
+        inner = ast._mark()
+        ast['name'] = 'world'
+        ast['list'] = 'c'
+        ast['empty'] = 1
+        ast.setlist('names', 2)
+        ast['value'] = 3
+        del ast['name']
+        ast._rollback(inner)
+        self.assertEqual(
+            [('name', 'hello'), ('list', ['a', 'b']), ('names', []), ('empty', None)],
+            list(ast.items())
+        )
+
+        ast._rollback(outer)
+        self.assertEqual(before, list(ast.items()))
+        self.assertEqual('a', ast.list)
+        self.assertIsNone(ast._journal)
+
+        mark = ast._mark()
+        ast['value'] = 3
+        ast._release(mark)
+        self.assertEqual(3, ast.value)
+        self.assertIsNone(ast._journal)
+
 
 def suite():
     return unittest.TestLoader().loadTestsFromTestCase(ASTTests)
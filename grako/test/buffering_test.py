@@ -8,13 +8,17 @@ grako.buffering.Buffer.
 from __future__ import (absolute_import, division, print_function,
                         unicode_literals)
 
+import io
 import os
 import random
 import unittest
 from codecs import open
 
-from grako.buffering import Buffer
+import grako
+from grako import buffering
+from grako.buffering import Buffer, MmapBuffer, StreamBuffer, compiled_regex
 from grako.util import ustr
+from grako.exceptions import ParseError
 
 
 class BufferingTests(unittest.TestCase):
@@ -95,6 +99,234 @@ class BufferingTests(unittest.TestCase):
         b = Buffer('\n')
         self.assertEqual(2, b.linecount)
 
+    def test_line_starts(self):
+        b = Buffer('ab\r\ncd\n\nef', whitespace='')
+        self.assertEqual([0, 4, 7, 8, 10], list(b._line_starts))
+        self.assertEqual(0, b.posline(3))
+        self.assertEqual(3, b.poscol(3))
+        self.assertEqual(1, b.posline(4))
+        self.assertEqual(2, b.posline(7))
+        self.assertEqual(3, b.posline(9))
+        self.assertEqual(1, b.poscol(9))
+        self.assertEqual(b.linecount, b.posline(10))
+
+    def test_mmap_consistency(self):
+        testfile = os.path.splitext(__file__)[0] + '.py'
+        with Buffer.from_file(testfile, mmap=True, whitespace='') as buf:
+            self.assertIsInstance(buf, MmapBuffer)
+            self.assertEqual(self.buf.linecount, buf.linecount)
+            self.assertEqual(self.buf.get_lines(), buf.get_lines())
+
+            chars = []
+            while not buf.atend():
+                info = buf.line_info()
+                self.assertEqual(info.text, self.buf.get_line(info.line))
+                chars.append(buf.next())
+            self.assertEqual(self.text, ''.join(chars))
+
+    def test_mmap_match(self):
+        testfile = os.path.splitext(__file__)[0] + '.py'
+        with Buffer.from_file(testfile, mmap=True) as buf:
+            self.assertEqual('#', buf.match('#'))
+            buf.next_token()
+            self.assertEqual('-*-', buf.matchre(r'-\*-'))
+            self.assertIsNone(buf.match('coding'))
+            buf.next_token()
+            self.assertEqual('coding', buf.match('coding'))
+            self.assertEqual(0, buf.line)
+
+    def test_mmap_match_non_ascii(self):
+        text = '"é" añb\nxé'
+        buf = MmapBuffer(text.encode('utf-8'))
+        self.assertEqual('"', buf.matchre('"'))
+        self.assertEqual('é', buf.matchre(r'[^"\\]'))
+        self.assertEqual('"', buf.matchre('.'))
+        buf.next_token()
+        self.assertEqual('añb', buf.matchre(r'\w+'))
+        buf.next_token()
+        self.assertEqual('xé', buf.matchre(r'x\w'))
+        self.assertTrue(buf.atend())
+
+        # patterns that match across lines
+        text = 'a\nxé b\n\nñ'
+        for pattern in (r'a\s\w\w', r'a[^b]+', r'(?s)a..é', r'a\nx\w', r'a[\w\s]*ñ'):
+            expected = Buffer(text).matchre(pattern)
+            self.assertIsNotNone(expected)
+            self.assertEqual(expected, MmapBuffer(text.encode('utf-8')).matchre(pattern))
+
+        # the string rule of etc/json.ebnf
+        grammar = r'''
+            start = '{' string ':' string '}' $ ;
+            string = /"/ ~ @:?/([^"\\]|\\["/bfnrt\\]|\\u[0-9A-Za-z]{4})/? /"/ ;
+        '''
+        model = grako.compile(grammar)
+        text = '{"b": "é"}'
+        self.assertEqual(['{', 'b', ':', 'é', '}'], model.parse(text))
+        self.assertEqual(model.parse(text), model.parse(MmapBuffer(text.encode('utf-8'))))
+
+    def test_stream_consistency(self):
+        chunks = (self.text[i:i + 7] for i in range(0, len(self.text), 7))
+        buf = StreamBuffer(chunks, chunk_size=7, whitespace='')
+        for p in range(len(self.text) + 2):
+            self.assertEqual(self.buf.line_info(p), buf.line_info(p))
+        self.assertEqual(self.buf.linecount, buf.linecount)
+        self.assertEqual(self.buf.get_lines(), buf.get_lines())
+
+    def test_stream_release(self):
+        grammar = '''
+            start = {record}* $ ;
+            record = name:name ~ '=' value:number ';' ;
+            name = /\\w+/ ;
+            number = /\\d+/ ;
+        '''
+        model = grako.compile(grammar)
+        text = ''.join('k%d = %d;\n' % (i, i) for i in range(5000))
+
+        buf = StreamBuffer(io.StringIO(text), chunk_size=1024, window=256)
+        ast = model.parse(buf)
+        self.assertEqual(model.parse(text), ast)
+        self.assertEqual(5000, len(ast))
+        self.assertTrue(len(buf.text) < 3 * 1024)
+        self.assertEqual(text.count('\n') + 1, buf.linecount)
+
+        buf.goto(0)
+        self.assertRaises(ParseError, buf.current)
+
+    def test_stream_nested_cut(self):
+        # the cut commits only the option within the closure, and
+        # the choice in start still goes back to the beginning
+        grammar = '''
+            start = (a | b) $ ;
+            a = {('<' ~ '>' | '#')} '!' ;
+            b = {'<' '>'} '?' ;
+        '''
+        model = grako.compile(grammar)
+        text = '<>\n' * 3000 + '?'
+
+        buf = StreamBuffer(io.StringIO(text), chunk_size=1024, window=256)
+        self.assertEqual(model.parse(text), model.parse(buf))
+
+    def test_stream_bytes(self):
+        buf = StreamBuffer(io.BytesIO(b'abc'), chunk_size=2)
+        buf.goto(10)
+        self.assertEqual('abc', buf.text)
+        self.assertEqual(3, buf.pos)
+
+        # a character split between chunks
+        text = 'añb\nçd'
+        buf = StreamBuffer(io.BytesIO(text.encode('utf-8')), chunk_size=2, whitespace='')
+        self.assertEqual('añb', buf.matchre(r'\w+'))
+        self.assertEqual(text.splitlines(True), buf.get_lines())
+
+    def test_fused_skip(self):
+        text = '  (* one *) # two\n\t(* three *)\n  four # five\n'
+        options = dict(
+            comments_re=r'\(\*((?:.|\n)*?)\*\)',
+            eol_comments_re=r'#([^\n]*?)$',
+        )
+        fused = Buffer(text, **options)
+        looped = Buffer(text, comment_recovery=True, **options)
+        self.assertTrue(fused.build_skip_re())
+        self.assertFalse(looped.build_skip_re())
+
+        for buf in (fused, looped):
+            buf.next_token()
+            self.assertEqual('four', buf.match('four'))
+            buf.next_token()
+            self.assertTrue(buf.atend())
+
+        # an empty match would stop the fused regex too early
+        buf = Buffer('xx  x', whitespace=' ', comments_re='x*')
+        self.assertFalse(buf.build_skip_re())
+        buf.next_token()
+        self.assertTrue(buf.atend())
+
+    def test_skip_cache(self):
+        grammar = '''
+            start = {statement}+ $ ;
+            statement = 'if' ~ name | 'while' ~ name | 'print' ~ name ;
+            name = /\\w+/ ;
+        '''
+        model = grako.compile(grammar)
+        text = '  (* a *)  print x\n\n  while y   if z  print w'
+
+        class CountingBuffer(Buffer):
+            skips = 0
+
+            def _next_token(self):
+                CountingBuffer.skips += 1
+                super(CountingBuffer, self)._next_token()
+
+        options = dict(comments_re=r'\(\*((?:.|\n)*?)\*\)')
+        ast = model.parse(CountingBuffer(text, **options))
+        uncached = CountingBuffer.skips
+
+        CountingBuffer.skips = 0
+        buf = CountingBuffer(text, skip_cache=True, **options)
+        self.assertEqual(ast, model.parse(buf))
+        self.assertTrue(CountingBuffer.skips < uncached)
+        # the skips behind the last cut are forgotten
+        cutpos = text.rindex('print') + len('print')
+        self.assertEqual([cutpos, cutpos + 1, len(text)], sorted(buf._skip_positions))
+
+        buf.replace_lines(0, 0, 'replaced', 'if a\n')
+        self.assertEqual({}, buf._skip_positions)
+
+    def test_match_any(self):
+        tokens = ('if', 'iffy', 'if-', '<', '<=')
+        for text in ('iffy', 'if-', 'if x', '<=', 'ifé', 'x'):
+            buf = Buffer(text, namechars='-')
+            expected = None
+            for token in tokens:
+                expected = buf.match(token)
+                if expected is not None:
+                    break
+            buf.goto(0)
+            self.assertEqual(expected, buf.match_any(tokens))
+            self.assertEqual(len(expected or ''), buf.pos)
+
+        for text in ('ifé', 'if é'):
+            buf = MmapBuffer(text.encode('utf-8'))
+            expected = buf.match('if')
+            buf.goto(0)
+            self.assertEqual(expected, buf.match_any(('iffy', 'if')))
+
+    def test_match_ignorecase(self):
+        for text in ('x SELECT selected', '\u0130 SELECT selected'):
+            for buf in (Buffer(text, ignorecase=True),
+                        StreamBuffer([text], ignorecase=True),
+                        MmapBuffer(text.encode('utf-8'), ignorecase=True)):
+                buf.next()
+                buf.next_token()
+                self.assertIsNone(buf.match('Selected'))
+                self.assertEqual('select', buf.match('select'))
+                buf.next_token()
+                self.assertIsNone(buf.match('select'))
+                self.assertEqual('SELECTED', buf.match('SELECTED'))
+                self.assertTrue(buf.atend())
+
+        # the same as lowering the text at the token, where a capital
+        # sigma lowers to a final sigma
+        for buf in (Buffer('\u039f\u03a3\u0391', ignorecase=True, nameguard=False),
+                    StreamBuffer(['\u039f\u03a3\u0391'], ignorecase=True, nameguard=False)):
+            self.assertEqual('\u03bf\u03c2', buf.match('\u03bf\u03c2'))
+
+    def test_regex_registry(self):
+        a = Buffer('a')
+        b = StreamBuffer(['b'])
+        self.assertIs(a._compile(r'\w+'), b._compile(r'\w+'))
+        self.assertIsNot(a._compile(r'\w+'), a._compile(r'\w+', ignorecase=True))
+
+        regex = a._compile('x')
+        self.assertIs(regex, a._compile(regex))
+        ignorecase = Buffer('X', ignorecase=True)
+        self.assertEqual('X', ignorecase.matchre(regex))
+
+        # the registry doesn't grow without bound
+        for i in range(2 * buffering._MAXCACHE):
+            compiled_regex('x{%d}' % i)
+        self.assertTrue(len(buffering._REGEX_REGISTRY) <= buffering._MAXCACHE)
+
 
 def suite():
     return unittest.TestLoader().loadTestsFromTestCase(BufferingTests)
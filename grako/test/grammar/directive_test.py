@@ -136,3 +136,102 @@ class DirectiveTests(unittest.TestCase):
         code = codegen(model)
         self.assertTrue('parseinfo=False' in code)
         compile(code, 'test.py', EXEC)
+
+    def test_nomemo_decorator(self):
+        grammar = r'''
+            start = {item}+ $ ;
+
+            @nomemo
+            item = number | word ;
+
+            number = /\d+/ ;
+            word = /[a-z]+/ ;
+        '''
+        model = grako.compile(grammar, "test")
+        rules = {rule.name: rule for rule in model.rules}
+        self.assertFalse(rules['item'].is_memo)
+        self.assertTrue(rules['number'].is_memo)
+        self.assertTrue('@nomemo\nitem' in str(model))
+
+        ast = model.parse('abc 12 d')
+        self.assertEqual(['abc', '12', 'd'], ast)
+
+        code = codegen(model)
+        self.assertTrue('@graken()\n    @nomemo\n    def _item_(self):' in code)
+        module = {}
+        exec(compile(code, 'test.py', EXEC), module)
+        parser = module['testParser']()
+        self.assertEqual(['abc', '12', 'd'], parser.parse('abc 12 d'))
+
+    def test_memoize_directive(self):
+        grammar = r'''
+            @@memoize :: auto
+            @@left_recursion :: True
+
+            start = expr $ ;
+
+            expr = expr '+' term | term ;
+
+            term = call | var ;
+
+            call = name '(' ')' ;
+
+            var = name ;
+
+            name = /[a-z]+/ ;
+
+            unused = &value value | number ;
+
+            value = number ;
+
+            number = /\d+/ ;
+        '''
+        model = grako.compile(grammar, "test")
+        self.assertEqual('auto', model.directives.get('memoize'))
+        self.assertTrue('@@memoize :: auto' in str(model))
+
+        rules = {rule.name: rule for rule in model.rules}
+        memoized = {name for name, rule in rules.items() if rule.is_memo}
+        # expr is left recursive, both options of expr lead to term,
+        # value follows a lookahead of itself, and name is trivial
+        self.assertEqual({'expr', 'term', 'call', 'var', 'value'}, memoized)
+        self.assertTrue(rules['expr'].is_leftrec)
+        self.assertFalse(rules['term'].is_leftrec)
+
+        ast = model.parse('a + b() + c')
+        self.assertEqual(['a', '+', ['b', '(', ')'], '+', 'c'], ast)
+
+        grammar = '''
+            @@memoize :: False
+
+            start = name $ ;
+
+            name = /[a-z]+/ ;
+        '''
+        model = grako.compile(grammar, "test")
+        self.assertFalse(any(rule.is_memo for rule in model.rules))
+        self.assertEqual('abc', model.parse('abc'))
+
+        # @nomemo excludes a rule that would be memoized
+        grammar = r'''
+            @@memoize :: auto
+            @@left_recursion :: True
+
+            start = expr $ ;
+
+            expr = expr '+' term | term ;
+
+            term = call | var ;
+
+            @nomemo
+            call = name '(' ')' ;
+
+            var = name ;
+
+            name = /[a-z]+/ ;
+        '''
+        model = grako.compile(grammar, "test")
+        rules = {rule.name: rule for rule in model.rules}
+        self.assertTrue(rules['term'].is_memo)
+        self.assertFalse(rules['call'].is_memo)
+        self.assertEqual(['a', '+', ['b', '(', ')']], model.parse('a + b()'))
@@ -7,6 +7,8 @@ import unittest
 
 from grako.exceptions import FailedParse
 from grako.tool import compile
+from grako.codegen import codegen
+from grako.util import builtins
 
 
 class LeftRecursionTests(unittest.TestCase):
@@ -170,6 +172,66 @@ class LeftRecursionTests(unittest.TestCase):
         ast = model_b.parse("(((1+2)))", trace=trace, colorize=True)
         self.assertEqual(['1', '+', '2'], ast)
 
+    def test_nested_left_recursion_in_parens(self, trace=False):
+        grammar = '''
+            @@left_recursion :: True
+            start = expre $ ;
+            expre = expre '+' factor | expre '-' factor | factor ;
+            factor = '(' expre ')' | number ;
+            number = /[0-9]+/ ;
+        '''
+        model = compile(grammar, "test")
+        ast = model.parse("1+(2-3)+((4))", trace=trace, colorize=True)
+        self.assertEqual(
+            ['1', '+', ['(', ['2', '-', '3'], ')'], '+', ['(', ['(', '4', ')'], ')']],
+            ast
+        )
+
+    def test_left_recursion_failure(self):
+        grammar = '''
+            @@left_recursion :: True
+            start = expre $ ;
+            expre = expre '+' factor | expre '-' factor | factor ;
+            factor = number | name ;
+            number = /[0-9]+/ ;
+            name = /[a-z]+/ ;
+        '''
+        model = compile(grammar, "test")
+        for text, pos in (('1+', 2), ('a+', 2), ('+', 0), ('1+2-', 4)):
+            with self.assertRaises(FailedParse) as cm:
+                model.parse(text)
+            e = cm.exception
+            self.assertEqual(pos, e.pos)
+            self.assertNotEqual('infinite left recursion', e.message)
+            self.assertEqual("expecting '[0-9]+'", e.message)
+
+    def test_left_recursive_rules(self):
+        grammar = '''
+            @@left_recursion :: True
+            start = e $ ;
+            e = [e '+'] t ;
+            t = f '*' t | f ;
+            f = ['-'] p ;
+            p = n | '(' e ')' ;
+            n = /[0-9]+/ ;
+            x = [/-?/] y ;
+            y = x 'a' | 'b' ;
+        '''
+        model = compile(grammar, "test")
+        leftrec = {rule.name for rule in model.rules if rule.is_leftrec}
+        self.assertEqual({'e', 'x', 'y'}, leftrec)
+
+        code = codegen(model)
+        self.assertTrue("left_recursive_rules = frozenset(['e', 'x', 'y'])" in code)
+        module = {}
+        exec(builtins.compile(code, 'test.py', 'exec'), module)
+        parser = module['testParser']()
+        for text in ('1+2*3', '-1*-(2+3)', '(1+2)+(3+(4+5))*6'):
+            self.assertEqual(model.parse(text), parser.parse(text))
+
+        with self.assertRaises(FailedParse):
+            parser.parse('1+2', left_recursion=False)
+
     def notest_left_recursion_bug(self, trace=False):
         grammar = '''\
             @@grammar :: Minus
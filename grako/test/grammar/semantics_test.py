@@ -6,6 +6,7 @@ from __future__ import absolute_import, division, print_function, unicode_litera
 import unittest
 
 from grako.tool import compile
+from grako.contexts import ParseContext
 from grako.semantics import ModelBuilderSemantics
 
 
@@ -36,3 +37,43 @@ class SemanticsTests(unittest.TestCase):
         model = compile(grammar, 'test')
         ast = model.parse(text, semantics=semantics)
         self.assertEqual('5.4.3.2.1', ast)
+
+    def test_semantic_actions_cache(self):
+        class Semantics(object):
+            lookups = 0
+
+            def __getattribute__(self, name):
+                if not name.startswith('__'):
+                    Semantics.lookups += 1
+                return super(Semantics, self).__getattribute__(name)
+
+            def number(self, ast):
+                return int(ast)
+
+            def _postproc(self, ctx, node):
+                pass
+
+        grammar = r'''
+            start = {number}+ $ ;
+            number = /\d+/ ;
+        '''
+        model = compile(grammar, 'test')
+        semantics = Semantics()
+        self.assertEqual([5], model.parse('5', semantics=semantics))
+        lookups = Semantics.lookups
+        self.assertEqual([1, 2, 3, 4, 5, 6], model.parse('1 2 3 4 5 6', semantics=semantics))
+        # the actions are looked up once per rule, not once per invocation
+        self.assertEqual(2 * lookups, Semantics.lookups)
+
+        ctx = ParseContext(semantics=semantics)
+        number, postproc = ctx._find_semantic_rule('number')
+        self.assertEqual(3, number('3'))
+        self.assertIsNotNone(postproc)
+        self.assertEqual((None, postproc), ctx._find_semantic_rule('start'))
+        self.assertEqual(['number', 'start'], sorted(ctx.semantic_actions))
+
+        ctx.semantics = ModelBuilderSemantics()
+        self.assertEqual({}, ctx.semantic_actions)
+        default, postproc = ctx._find_semantic_rule('number')
+        self.assertEqual(ctx.semantics._default, default)
+        self.assertIsNone(postproc)
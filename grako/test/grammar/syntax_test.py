@@ -8,7 +8,7 @@ import unittest
 
 from grako.exceptions import FailedParse
 from grako.tool import compile
-from grako.util import trim, ustr
+from grako.util import trim, ustr, builtins
 from grako.codegen import codegen
 from grako.grammars import EBNFBuffer
 
@@ -314,3 +314,152 @@ class SyntaxTests(unittest.TestCase):
         model = compile(grammar, "start")
         print(model.pretty())
         self.assertEqual(trim(pretty), model.pretty())
+
+    def test_choice_dispatch(self):
+        grammar = r'''
+            start = {statement}+ $ ;
+
+            statement
+                =
+                | 'If' value ';'
+                | 'if' value
+                | 'print' value
+                | ['-'] number
+                | name '=' value
+                ;
+
+            value = number | name ;
+
+            number = /\d+/ ;
+
+            name = /[a-z]+/ ;
+        '''
+        model = compile(grammar, 'test')
+        choice = model.rules[1].exp
+        self.assertEqual(
+            [{'I', 'i'}, {'i'}, {'p'}, None, None],
+            choice.option_chars
+        )
+        self.assertEqual(
+            [False, False, False, True, True],
+            choice.option_refs
+        )
+
+        code = codegen(model)
+        self.assertTrue("if c0 in {'I', 'i'}:" in code)
+
+        module = {}
+        exec(builtins.compile(code, 'test.py', 'exec'), module)
+        text = 'if 1 If x; print y -3 z = 4'
+        for ignorecase in (False, True):
+            parser = module['testParser'](ignorecase=ignorecase)
+            self.assertEqual(
+                model.parse(text, ignorecase=ignorecase),
+                parser.parse(text)
+            )
+
+        # skipping options doesn't change the errors reported
+        grammar = r'''
+            start = {statement}+ $ ;
+            statement = assign | call | block ;
+            assign = 'let' name '=' value ';' ;
+            call = 'do' name ';' ;
+            block = '{' {statement} '}' ;
+            value = number | name ;
+            number = /\d+/ ;
+            name = /[a-z]+/ ;
+        '''
+        model = compile(grammar, 'test')
+        code = codegen(model)
+        module = {}
+        exec(builtins.compile(code, 'test.py', 'exec'), module)
+        for text in ('x', 'let', 'let x = ;', 'do ;', '{ x }', 'do x; y', '{ do x; ', 'let x = 1; q'):
+            with self.assertRaises(FailedParse) as expected:
+                model.parse(text)
+            with self.assertRaises(FailedParse) as cm:
+                module['testParser']().parse(text)
+            self.assertEqual(str(expected.exception), str(cm.exception))
+
+    def test_pattern_constants(self):
+        grammar = r'''
+            start = {word | number}+ $ ;
+            word = /[a-z]+/ ;
+            number = /\d+/ | /[a-z]+/ ':' /\d+/ ;
+        '''
+        model = compile(grammar, 'test')
+        code = codegen(model)
+        self.assertTrue("PATTERN_0 = re.compile(r'[a-z]+', RE_FLAGS)" in code)
+        self.assertTrue("PATTERN_1 = re.compile(r'\\d+', RE_FLAGS)" in code)
+        self.assertFalse('PATTERN_2' in code)
+        self.assertEqual(2, code.count('self._pattern(PATTERN_0)'))
+
+        module = {}
+        exec(builtins.compile(code, 'test.py', 'exec'), module)
+        text = 'abc 12 DEF'
+        parser = module['testParser'](ignorecase=True)
+        self.assertEqual(['abc', '12', 'DEF'], parser.parse(text))
+        self.assertEqual(['abc', '12', 'DEF'], model.parse(text, ignorecase=True))
+        self.assertRaises(FailedParse, module['testParser']().parse, text)
+
+    def test_token_choice(self):
+        grammar = r'''
+            start = {statement | '<' '>'}+ $ ;
+            statement = keyword name ';' ;
+            keyword = 'if' | 'iffy' | '<' | '<=' ;
+            name = /[a-z0-9]+/ ;
+        '''
+        model = compile(grammar, 'test')
+        self.assertEqual(('if', 'iffy', '<', '<='), model.rules[2].exp.tokens)
+        self.assertIsNone(model.rules[0].exp.sequence[0].exp.tokens)
+
+        code = codegen(model)
+        self.assertTrue("self._token_choice(('if', 'iffy', '<', '<='), " in code)
+
+        module = {}
+        exec(builtins.compile(code, 'test.py', 'exec'), module)
+        text = "iffy a; if b; <> < d; IF e;"
+        expected = [
+            ['iffy', 'a', ';'],
+            ['if', 'b', ';'],
+            ['<', '>'],
+            ['<', 'd', ';'],
+        ]
+        for ignorecase in (False, True):
+            parser = module['testParser'](ignorecase=ignorecase)
+            if ignorecase:
+                ast = model.parse(text, ignorecase=True)
+                self.assertEqual(expected + [['if', 'e', ';']], ast)
+                self.assertEqual(ast, parser.parse(text))
+            else:
+                self.assertRaises(FailedParse, model.parse, text)
+                self.assertRaises(FailedParse, parser.parse, text)
+                ast = model.parse(text[:-6])
+                self.assertEqual(expected, ast)
+                self.assertEqual(ast, parser.parse(text[:-6]))
+
+    def test_rule_info(self):
+        grammar = r'''
+            start = {statement}+ $ ;
+            statement = name:NAME '=' args+:value {',' args+:value} ';' ;
+            value = NAME | /\d+/ ;
+            NAME = /[a-z]+/ ;
+        '''
+        model = compile(grammar, 'test')
+        code = codegen(model)
+        self.assertTrue("('name',),\n            ('args',)\n" in code)
+
+        module = {}
+        exec(builtins.compile(code, 'test.py', 'exec'), module)
+        parser_class = module['testParser']
+        statement = parser_class._statement_.ruleinfo
+        self.assertEqual('statement', statement.name)
+        self.assertFalse(statement.is_lexical)
+        self.assertTrue(statement.is_memo)
+        self.assertTrue(parser_class._NAME_.ruleinfo.is_lexical)
+
+        text = 'a = b, 1; c = 2;'
+        ast = model.parse(text)
+        self.assertEqual(ast, parser_class().parse(text, parseinfo=False))
+        self.assertEqual('a', ast[0].name)
+        self.assertEqual(['b', '1'], ast[0].args)
+        self.assertEqual(['2'], ast[1].args)
@@ -0,0 +1,165 @@
+# -*- coding: utf-8 -*-
+# Copyright (C) 2017      by Juancarlo Añez
+# Copyright (C) 2012-2016 by Juancarlo Añez and Thomas Bragg
+from __future__ import absolute_import, division, print_function, unicode_literals
+
+import io
+import unittest
+
+import grako
+from grako.buffering import Buffer
+from grako.exceptions import FailedLeftRecursion
+from grako.util import builtins
+from grako.memos import MemoCache, LRUMemoCache, WindowMemoCache, memo_key, new_memo_cache
+from grako.memos import render_heatmap
+
+
+class MemoCacheTests(unittest.TestCase):
+
+    def test_get_set(self):
+        cache = MemoCache()
+        key = memo_key('rule', None)
+        self.assertIsNone(cache.get(0, key))
+        cache.set(0, key, 'result')
+        self.assertEqual('result', cache.get(0, key))
+        self.assertIsNone(cache.get(0, memo_key('rule', 'state')))
+        self.assertIn((0, key), cache)
+        self.assertEqual(1, len(cache))
+
+    def test_prune(self):
+        cache = MemoCache()
+        for pos in [5, 3, 8, 1, 3]:
+            cache.set(pos, 'a', pos)
+            cache.set(pos, 'b', pos)
+        self.assertEqual(8, len(cache))
+
+        cache.prune(4)
+        self.assertEqual(4, len(cache))
+        self.assertEqual(4, cache.pruned)
+        self.assertEqual(8, cache.peak)
+        self.assertIsNone(cache.get(3, 'a'))
+        self.assertEqual(5, cache.get(5, 'b'))
+
+        cache.set(2, 'a', 2)
+        cache.prune(6)
+        self.assertEqual([((8, 'a'), 8), ((8, 'b'), 8)], sorted(cache.items()))
+
+    def test_prune_values(self):
+        cache = MemoCache()
+        for pos in range(4):
+            cache.set(pos, 'a', pos)
+        cache.prune_values(lambda v: v % 2)
+        self.assertEqual(2, len(cache))
+        self.assertIsNone(cache.get(1, 'a'))
+        self.assertEqual(2, cache.get(2, 'a'))
+
+    def test_new_memo_cache(self):
+        self.assertIsInstance(new_memo_cache(), MemoCache)
+        self.assertIsInstance(new_memo_cache(10), LRUMemoCache)
+        self.assertIsInstance(new_memo_cache(10, 'window'), WindowMemoCache)
+        self.assertRaises(ValueError, new_memo_cache, 10, 'random')
+
+    def test_lru(self):
+        cache = LRUMemoCache(3)
+        guard = FailedLeftRecursion(Buffer(''), [], 'a')
+        cache.set(0, 'guard', guard)
+        cache.set(1, 'a', 1)
+        cache.set(2, 'a', 2)
+        self.assertEqual(1, cache.get(1, 'a'))
+
+        cache.set(3, 'a', 3)
+        self.assertEqual(3, len(cache))
+        self.assertEqual(1, cache.evictions)
+        self.assertIsNone(cache.get(2, 'a'))
+        self.assertIs(guard, cache.get(0, 'guard'))
+        self.assertEqual(1, cache.get(1, 'a'))
+        self.assertEqual(3, cache.get(3, 'a'))
+
+        cache.prune(2)
+        self.assertEqual(1, len(cache))
+        self.assertEqual(3, cache.get(3, 'a'))
+        self.assertEqual(
+            dict(size=1, stored=4, hits=5, misses=1, pruned=2, evictions=1, rejected=0, peak=4),
+            cache.stats()
+        )
+
+    def test_window(self):
+        cache = WindowMemoCache(2)
+        guard = FailedLeftRecursion(Buffer(''), [], 'a')
+        cache.set(0, 'guard', guard)
+        cache.set(0, 'a', 0)
+        cache.set(1, 'a', guard)
+        for pos in range(1, 5):
+            cache.set(pos, 'b', pos)
+        self.assertIs(guard, cache.get(0, 'guard'))
+        self.assertIsNone(cache.get(0, 'a'))
+        self.assertIsNone(cache.get(1, 'b'))
+        self.assertEqual(2, cache.get(2, 'b'))
+
+        # a result replacing a guard outside the window drops the guard
+        cache.set(1, 'a', 'result')
+        self.assertIsNone(cache.get(1, 'a'))
+        self.assertEqual(4, len(cache))
+        self.assertEqual(3, cache.evictions)
+
+        # results outside the window are not stored
+        cache.set(0, 'c', 0)
+        self.assertIsNone(cache.get(0, 'c'))
+        self.assertEqual(3, cache.evictions)
+        self.assertEqual(1, cache.rejected)
+
+    def test_bounded_parse(self):
+        grammar = '''
+            start = {expre ';'}+ $ ;
+            expre = term '+' expre | term '-' expre | term ;
+            term = factor '*' term | factor ;
+            factor = '(' expre ')' | number ;
+            number = /\\d+/ ;
+        '''
+        model = grako.compile(grammar)
+        text = '1 + 2 * (3 - 4) * 5 - 6;' * 20
+        expected = model.parse(text)
+        for policy in ['lru', 'window']:
+            ast = model.parse(text, memo_limit=8, memo_policy=policy)
+            self.assertEqual(expected, ast)
+
+    def test_memo_heat(self):
+        grammar = r'''
+            start = {statement}+ $ ;
+            statement = assignment | call ;
+            assignment = name '=' name ';' ;
+            call = name '(' ')' ';' ;
+            name = /[a-z]+/ ;
+        '''
+        text = 'a = b;\nf();\ng();'
+
+        code = grako.to_python_sourcecode(grammar, name='Test')
+        module = {}
+        exec(builtins.compile(code, 'test.py', 'exec'), module)
+        parser = module['TestParser'](memo_heatmap=True)
+        parser.parse(text)
+        # the names of the calls, and the one tried at the end of the
+        # text, are parsed again by call after assignment fails
+        self.assertEqual({1: 1, 2: 2}, parser.memo_heat)
+        self.assertEqual(3, parser.memo_stats['hits'])
+        self.assertTrue(parser.memo_stats['stored'] >= parser.memo_stats['size'])
+
+        out = io.StringIO()
+        render_heatmap(parser.memo_heat, width=10, out=out)
+        self.assertEqual(['     2        1 #####', '     3        2 ##########'], out.getvalue().splitlines())
+
+        parser = module['TestParser']()
+        parser.parse(text)
+        self.assertEqual({}, parser.memo_heat)
+
+
+def suite():
+    return unittest.TestLoader().loadTestsFromTestCase(MemoCacheTests)
+
+
+def main():
+    unittest.TextTestRunner(verbosity=2).run(suite())
+
+
+if __name__ == '__main__':
+    main()
@@ -6,8 +6,10 @@ from __future__ import absolute_import, division, print_function, unicode_litera
 import unittest
 
 import grako
-from grako.util import trim, eval_escapes
+from grako.exceptions import FailedParse, FailedToken
+from grako.util import trim, eval_escapes, LinkedStack, builtins
 from grako.grammars import EBNFBuffer
+from grako.tracing import ArrayTraceSink
 
 
 class MockIncludeBuffer(EBNFBuffer):
@@ -59,6 +61,134 @@ class ParsingTests(unittest.TestCase):
         ast = grako.parse(grammar, "test", rule_name='start')
         self.assertEqual(ast, "test")
 
+    def test_lazy_failures(self):
+        grammar = '''
+            start = {statement}+ $ ;
+            statement = assignment | call ;
+            assignment = name '=' value ';' ;
+            call = name '(' [value] ')' ';' ;
+            value = name | number ;
+            name = /[a-z]+/ ;
+            number = /\\d+/ ;
+        '''
+        model = grako.compile(grammar)
+        text = 'a = 1; f(b); g(2);'
+        self.assertEqual(
+            model.parse(text),
+            model.parse(text, lazy_failures=True)
+        )
+
+        with self.assertRaises(FailedToken) as cm:
+            model.parse('a = 1; f(b;', lazy_failures=True)
+        e = cm.exception
+        self.assertEqual(10, e.pos)
+        self.assertEqual("')'", e.message.split()[-1])
+        self.assertEqual(['call', 'statement', 'start'], e.stack)
+
+        # the first failure at the furthest position is reported
+        text = 'a = 1; b'
+        with self.assertRaises(FailedToken) as eager:
+            model.parse(text)
+        with self.assertRaises(FailedToken) as lazy:
+            model.parse(text, lazy_failures=True)
+        self.assertEqual(str(eager.exception), str(lazy.exception))
+        self.assertEqual('=', eager.exception.token)
+
+        # the same failures are reported with and without lazy_failures
+        grammar = '''
+            start = {statement}+ $ ;
+            statement = assignment | call | block ;
+            assignment = name '=' ~ value ';' ;
+            call = name '(' [value {',' value}] ')' ';' ;
+            block = '{' {statement} '}' ;
+            value = call_value | name | number ;
+            call_value = name '(' ')' ;
+            name = /[a-z]+/ ;
+            number = /\\d+/ ;
+        '''
+        model = grako.compile(grammar)
+        for text in ('a', 'a =', 'a = ;', 'f(1, )', 'f(a(), b(;', '{ a = 1; ',
+                     '{ f(); } x', 'a = 1 b = 2;', 'a = f(', '1', 'f(1 2);'):
+            with self.assertRaises(FailedParse) as eager:
+                model.parse(text)
+            with self.assertRaises(FailedParse) as lazy:
+                model.parse(text, lazy_failures=True)
+            self.assertEqual(type(eager.exception), type(lazy.exception))
+            self.assertEqual(str(eager.exception), str(lazy.exception))
+
+    def test_failure_stack(self):
+        grammar = '''
+            start = {statement}+ $ ;
+            statement = call ;
+            call = name '(' ')' ';' ;
+            name = /[a-z]+/ ;
+        '''
+        model = grako.compile(grammar)
+        with self.assertRaises(FailedToken) as cm:
+            model.parse('f(); g(;')
+        e = cm.exception
+        # the stack is shared with the parser until it is read
+        self.assertIsInstance(e._stack, LinkedStack)
+        self.assertEqual(['call', 'statement', 'start'], e.stack)
+        self.assertTrue(str(e).endswith('call\nstatement\nstart'))
+
+        stack = LinkedStack().push('a')
+        self.assertEqual(['b', 'a'], list(stack.push('b')))
+        self.assertEqual(['a'], list(stack))
+        self.assertFalse(stack.rest)
+
+    def test_tracing(self):
+        grammar = '''
+            start = {item}+ $ ;
+            item = name | number ;
+            name = /[a-z]+/ ;
+            number = /[0-9]+/ ;
+        '''
+        code = grako.to_python_sourcecode(grammar, name='Test')
+        module = {}
+        exec(builtins.compile(code, 'test.py', 'exec'), module)
+
+        class TracedParser(module['TestParser']):
+            events = []
+
+            def _trace_event(self, event):
+                self.events.append(event)
+
+            def _trace_match(self, token, name=None, failed=False):
+                self.events.append(token)
+
+        parser = TracedParser()
+        ast = parser.parse('a 1 b')
+        self.assertEqual(['a', '1', 'b'], ast)
+        self.assertEqual([], TracedParser.events)
+
+        with self.assertLogs('grako', 'INFO'):
+            self.assertEqual(ast, module['TestParser']().parse('a 1 b', trace=True))
+
+        self.assertEqual(ast, parser.parse('a 1 b', trace=True))
+        self.assertTrue(TracedParser.events)
+        self.assertTrue('a' in TracedParser.events)
+
+        # tracing can be turned on and off between parses
+        del TracedParser.events[:]
+        parser = TracedParser()
+        parser.trace = True
+        self.assertTrue(parser._tracing)
+        parser.parse('a 1 b')
+        self.assertTrue(TracedParser.events)
+
+        del TracedParser.events[:]
+        parser.trace = False
+        self.assertFalse(parser._tracing)
+        parser.parse('a 1 b')
+        self.assertEqual([], TracedParser.events)
+
+        sink = ArrayTraceSink()
+        parser.trace_sink = sink
+        self.assertTrue(parser._tracing)
+        parser.parse('a 1 b')
+        self.assertTrue(sink.count)
+
 
 def suite():
     return unittest.TestLoader().loadTestsFromTestCase(ParsingTests)
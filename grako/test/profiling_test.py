@@ -0,0 +1,93 @@
+# -*- coding: utf-8 -*-
+# Copyright (C) 2017      by Juancarlo Añez
+# Copyright (C) 2012-2016 by Juancarlo Añez and Thomas Bragg
+from __future__ import absolute_import, division, print_function, unicode_literals
+
+import io
+import json
+import unittest
+
+import grako
+from grako.contexts import ParseContext
+from grako.profiling import ParseProfile
+from grako.util import builtins
+
+
+GRAMMAR = r'''
+    start = {statement}+ $ ;
+    statement = assignment | call ;
+    assignment = name '=' number ';' ;
+    call = name '(' ')' ';' ;
+    name = /[a-z]+/ ;
+    number = /\d+/ ;
+'''
+
+
+class ProfilingTests(unittest.TestCase):
+
+    def test_rule_profile(self):
+        model = grako.compile(GRAMMAR)
+        text = 'a = 1; f(); b = 2;'
+        profile = ParseProfile()
+        ast = model.parse(text, profile=profile)
+        self.assertEqual(model.parse(text), ast)
+
+        rules = profile.rules
+        self.assertEqual(1, rules['start'].calls)
+        self.assertEqual(1, rules['start'].successes)
+        self.assertEqual(len(text), rules['start'].consumed)
+
+        # the call is tried as an assignment first
+        self.assertEqual(4, rules['assignment'].calls)
+        self.assertEqual(2, rules['assignment'].successes)
+        self.assertEqual(2, rules['assignment'].failures)
+        self.assertEqual(len('f'), rules['assignment'].rewound)
+
+        # the names of the call and after the last statement are reused
+        self.assertEqual(2, rules['name'].memo_hits)
+        self.assertEqual(rules['name'].calls, rules['name'].memo_hits + rules['name'].memo_misses)
+
+        for rule in rules.values():
+            self.assertEqual(rule.calls, rule.successes + rule.failures)
+            self.assertTrue(0 <= rule.self_time <= rule.time)
+        self.assertTrue(rules['statement'].time >= rules['assignment'].time)
+
+        data = json.loads(profile.to_json())
+        self.assertEqual(set(rules), set(r['name'] for r in data))
+        self.assertEqual(data[0]['name'], profile.sorted()[0].name)
+
+        out = io.StringIO()
+        profile.report(key='calls', out=out)
+        lines = out.getvalue().splitlines()
+        self.assertTrue(lines[0].startswith('rule'))
+        self.assertEqual(len(rules) + 1, len(lines))
+
+    def test_profile_per_parse(self):
+        self.assertIsNone(ParseContext().rule_profile)
+
+        code = grako.to_python_sourcecode(GRAMMAR, name='Test')
+        module = {}
+        exec(builtins.compile(code, 'test.py', 'exec'), module)
+        parser = module['TestParser'](profile=True)
+
+        parser.parse('a = 1;')
+        first = parser.rule_profile
+        self.assertEqual(1, first.rules['assignment'].successes)
+
+        parser.parse('f(); g();')
+        self.assertIsNot(first, parser.rule_profile)
+        self.assertEqual(2, parser.rule_profile.rules['call'].successes)
+        self.assertEqual(1, first.rules['assignment'].successes)
+        self.assertEqual(0, first.rules['call'].successes)
+
+
+def suite():
+    return unittest.TestLoader().loadTestsFromTestCase(ProfilingTests)
+
+
+def main():
+    unittest.TextTestRunner(verbosity=2).run(suite())
+
+
+if __name__ == '__main__':
+    main()
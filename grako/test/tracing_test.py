@@ -0,0 +1,82 @@
+# -*- coding: utf-8 -*-
+# Copyright (C) 2017      by Juancarlo Añez
+# Copyright (C) 2012-2016 by Juancarlo Añez and Thomas Bragg
+from __future__ import absolute_import, division, print_function, unicode_literals
+
+import io
+import unittest
+
+import grako
+from grako import tracing
+from grako.tracing import ArrayTraceSink, JSONLTraceSink, load_jsonl, render
+
+
+GRAMMAR = r'''
+    start = {item}+ $ ;
+    item = name | number ;
+    name = /[a-z]+/ ;
+    number = /\d+/ ;
+'''
+
+
+class TracingTests(unittest.TestCase):
+
+    def test_array_sink(self):
+        model = grako.compile(GRAMMAR)
+        sink = ArrayTraceSink()
+        text = 'ab 12'
+        self.assertEqual(['ab', '12'], model.parse(text, trace_sink=sink))
+
+        events = list(sink.events())
+        self.assertEqual((tracing.ENTRY, 'start', 0, 0), events[0])
+        self.assertEqual((tracing.SUCCESS, 'start', 0, 5), events[-1])
+        self.assertIn((tracing.MATCH, 'name', 0, 2), events)
+        self.assertIn((tracing.NOMATCH, 'name', 3, 3), events)
+        self.assertIn((tracing.SUCCESS, 'number', 3, 5), events)
+        self.assertIn((tracing.FAILURE, 'name', 3, 3), events)
+        self.assertEqual(
+            len([e for e in events if e[0] == tracing.ENTRY]),
+            len([e for e in events if e[0] in (tracing.SUCCESS, tracing.FAILURE)])
+        )
+        self.assertEqual(['start', 'item', 'name', 'number'], sink.rules)
+        self.assertEqual(0, sink.dropped)
+
+        small = ArrayTraceSink(capacity=4)
+        model.parse(text, trace_sink=small)
+        self.assertEqual(len(events), small.count)
+        self.assertEqual(len(events) - 4, small.dropped)
+        self.assertEqual(events[-4:], list(small.events()))
+
+    def test_jsonl_sink(self):
+        model = grako.compile(GRAMMAR)
+        array = ArrayTraceSink()
+        model.parse('ab 12', trace_sink=array)
+
+        out = io.StringIO()
+        sink = JSONLTraceSink(out)
+        model.parse('ab 12', trace_sink=sink)
+        sink.close()
+        lines = out.getvalue().splitlines()
+        self.assertEqual('["rule", 0, "start"]', lines[0])
+        self.assertEqual('[0, 0, 0, 0]', lines[1])
+        self.assertEqual(list(array.events()), list(load_jsonl(lines)))
+
+        out = io.StringIO()
+        render(array.events(), text='ab 12', out=out)
+        rendered = out.getvalue().splitlines()
+        self.assertTrue(rendered[0].endswith(' start @1:1'))
+        self.assertTrue(rendered[1].startswith('  '))
+        self.assertTrue(any(line.strip().endswith('"12" @1:4') for line in rendered))
+        self.assertTrue(rendered[-1].endswith(' start @1:1-@1:6'))
+
+
+def suite():
+    return unittest.TestLoader().loadTestsFromTestCase(TracingTests)
+
+
+def main():
+    unittest.TextTestRunner(verbosity=2).run(suite())
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,219 @@
+# -*- coding: utf-8 -*-
+# Copyright (C) 2017      by Juancarlo Añez
+# Copyright (C) 2012-2016 by Juancarlo Añez and Thomas Bragg
+"""
+Structured tracing of parses.
+
+A trace sink passed to a parser (`trace_sink=`) records each rule
+invocation and each token or pattern match as a compact event, with the
+kind of event, the rule, and the positions it spans, instead of writing
+the colored text trace of `trace=True`. The events are rendered as text
+after the parse, so tracing large inputs costs little more than storing
+four integers per event:
+
+    python -m grako.tracing TRACE.jsonl [INPUT]
+"""
+from __future__ import absolute_import, division, print_function, unicode_literals
+
+import argparse
+import io
+import json
+import sys
+from array import array
+from bisect import bisect_right
+
+from ._unicode_characters import (
+    C_ENTRY,
+    C_SUCCESS,
+    C_FAILURE,
+    C_RECURSION,
+)
+
+__all__ = [
+    'TraceSink',
+    'ArrayTraceSink',
+    'JSONLTraceSink',
+    'load_jsonl',
+    'render',
+]
+
+
+# the kinds of trace events
+ENTRY = 0
+SUCCESS = 1
+FAILURE = 2
+RECURSION = 3
+MATCH = 4
+NOMATCH = 5
+
+EVENT_NAMES = ('entry', 'success', 'failure', 'recursion', 'match', 'nomatch')
+
+
+class TraceSink(object):
+    """
+    Receives the events of a parse as (kind, rule, pos, endpos).
+
+    For rule events, `rule` is the name of the rule invoked, and the
+    positions are those at which it started and ended, or failed. For
+    match events, `rule` is the rule in which the match was tried, and
+    the positions span the text matched.
+
+    Rule names are given small integer ids in order of appearance.
+    """
+    def __init__(self):
+        self.rules = []
+        self._rule_ids = {}
+
+    def rule_id(self, name):
+        id = self._rule_ids.get(name)
+        if id is None:
+            id = self._rule_ids[name] = len(self.rules)
+            self.rules.append(name)
+            self._new_rule(id, name)
+        return id
+
+    def _new_rule(self, id, name):
+        pass
+
+    def record(self, kind, rule, pos, endpos):
+        raise NotImplementedError
+
+    def events(self):
+        """ Iterate over the events recorded as (kind, rule, pos, endpos). """
+        raise NotImplementedError
+
+    def close(self):
+        pass
+
+
+class ArrayTraceSink(TraceSink):
+    """
+    Keep the last `capacity` events in memory, in a preallocated array.
+    """
+    def __init__(self, capacity=1 << 20):
+        super(ArrayTraceSink, self).__init__()
+        self.capacity = capacity
+        self.count = 0
+        self._data = array('q', [0]) * (4 * capacity)
+
+    @property
+    def dropped(self):
+        """ The number of events overwritten by newer ones. """
+        return max(0, self.count - self.capacity)
+
+    def __len__(self):
+        return min(self.count, self.capacity)
+
+    def record(self, kind, rule, pos, endpos):
+        i = 4 * (self.count % self.capacity)
+        data = self._data
+        data[i] = kind
+        data[i + 1] = self.rule_id(rule)
+        data[i + 2] = pos
+        data[i + 3] = endpos
+        self.count += 1
+
+    def events(self):
+        data = self._data
+        rules = self.rules
+        first = self.dropped
+        for n in range(first, self.count):
+            i = 4 * (n % self.capacity)
+            yield data[i], rules[data[i + 1]], data[i + 2], data[i + 3]
+
+    def clear(self):
+        self.count = 0
+
+
+class JSONLTraceSink(TraceSink):
+    """
+    Write the events to a file, one JSON array per line.
+
+    A line `["rule", id, name]` defines the id of a rule before its
+    first use, and the events follow as `[kind, id, pos, endpos]`.
+    """
+    def __init__(self, file):
+        super(JSONLTraceSink, self).__init__()
+        if hasattr(file, 'write'):
+            self._file = file
+            self._owned = False
+        else:
+            self._file = io.open(file, 'w', encoding='utf-8')
+            self._owned = True
+
+    def _new_rule(self, id, name):
+        self._file.write('["rule", %d, %s]\n' % (id, json.dumps(name)))
+
+    def record(self, kind, rule, pos, endpos):
+        self._file.write('[%d, %d, %d, %d]\n' % (kind, self.rule_id(rule), pos, endpos))
+
+    def close(self):
+        if self._owned:
+            self._file.close()
+        else:
+            self._file.flush()
+
+
+def load_jsonl(lines):
+    """ Iterate over the events in the lines written by a `JSONLTraceSink`. """
+    rules = {}
+    for line in lines:
+        if not line.strip():
+            continue
+        event = json.loads(line)
+        if event[0] == 'rule':
+            rules[event[1]] = event[2]
+        else:
+            kind, id, pos, endpos = event
+            yield kind, rules[id], pos, endpos
+
+
+def render(events, text=None, out=sys.stdout):
+    """
+    Write a trace as text, indented by the depth of rule invocation.
+    When the parsed `text` is given, positions are shown as line:column,
+    and matches with the text matched.
+    """
+    starts = None
+    if text is not None:
+        starts = [0] + [i + 1 for i, c in enumerate(text) if c == '\n']
+
+    def where(pos):
+        if starts is None:
+            return '@%d' % pos
+        line = bisect_right(starts, pos) - 1
+        return '@%d:%d' % (line + 1, pos - starts[line] + 1)
+
+    depth = 0
+    for kind, rule, pos, endpos in events:
+        if kind == ENTRY:
+            print('%s%s %s %s' % ('  ' * depth, C_ENTRY, rule, where(pos)), file=out)
+            depth += 1
+        elif kind in (SUCCESS, FAILURE, RECURSION):
+            depth = max(0, depth - 1)
+            mark = {SUCCESS: C_SUCCESS, FAILURE: C_FAILURE, RECURSION: C_RECURSION}[kind]
+            print('%s%s %s %s-%s' % ('  ' * depth, mark, rule, where(pos), where(endpos)), file=out)
+        else:
+            mark = C_SUCCESS if kind == MATCH else C_FAILURE
+            matched = ''
+            if text is not None and kind == MATCH:
+                matched = ' %s' % json.dumps(text[pos:endpos])
+            print('%s%s%s %s' % ('  ' * depth, mark, matched, where(pos)), file=out)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Render a trace written by a JSONLTraceSink.')
+    parser.add_argument('trace', metavar='TRACE', help='the trace file')
+    parser.add_argument('input', metavar='INPUT', nargs='?', help='the file that was parsed')
+    args = parser.parse_args(argv)
+
+    text = None
+    if args.input:
+        with io.open(args.input, encoding='utf-8') as f:
+            text = f.read()
+    with io.open(args.trace, encoding='utf-8') as f:
+        render(load_jsonl(f), text=text)
+
+
+if __name__ == '__main__':
+    main()
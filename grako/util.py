@@ -47,6 +47,7 @@ if PY3:
     else:
         Mapping = collections.Mapping
     zip_longest = itertools.zip_longest
+    accumulate = itertools.accumulate
     import builtins
     imap = map
     from io import StringIO
@@ -56,6 +57,18 @@ else:
     Mapping = collections.Mapping
     zip_longest = itertools.izip_longest
     imap = itertools.imap
+
+    def accumulate(iterable):
+        it = iter(iterable)
+        try:
+            total = next(it)
+        except StopIteration:
+            return
+        yield total
+        for x in it:
+            total += x
+            yield total
+
     import __builtin__ as builtins
     from StringIO import StringIO
 assert builtins
@@ -293,6 +306,7 @@ def chunks(iterable, size, fillvalue=None):
 
 def generic_main(custom_main, parser_class, name='Unknown'):
     import argparse
+    from grako.profiling import ParseProfile
 
     class ListRules(argparse.Action):
         def __call__(self, parser, namespace, values, option_string=None):
@@ -314,6 +328,10 @@ def generic_main(custom_main, parser_class, name='Unknown'):
     addarg('-n', '--no-nameguard', action='store_true',
            dest='no_nameguard',
            help="disable the 'nameguard' feature")
+    addarg('-p', '--profile', action='store_true',
+           help="print a profile of the rules to stderr after parsing")
+    addarg('--profile-json', metavar='PROFILE', type=str, default=None,
+           help="write the profile of the rules as JSON to PROFILE")
     addarg('-t', '--trace', action='store_true',
            help="output trace information")
     addarg('-w', '--whitespace', type=str, default=None,
@@ -328,6 +346,9 @@ def generic_main(custom_main, parser_class, name='Unknown'):
            default='start')
 
     args = argp.parse_args()
+    profile = None
+    if args.profile or args.profile_json:
+        profile = ParseProfile()
     try:
         return custom_main(
             args.file,
@@ -335,10 +356,17 @@ def generic_main(custom_main, parser_class, name='Unknown'):
             trace=args.trace,
             whitespace=args.whitespace,
             nameguard=not args.no_nameguard,
-            colorize=args.color
+            colorize=args.color,
+            profile=profile
         )
     except KeyboardInterrupt:
         pass
+    finally:
+        if args.profile:
+            profile.report(out=sys.stderr)
+        if args.profile_json:
+            with open(args.profile_json, 'w') as f:
+                profile.to_json(f)
 
 
 # decorator
@@ -383,3 +411,33 @@ def right_assoc(elements):
             return (op, left, assoc(it))
 
     return assoc(iter(elements))
+
+
+class LinkedStack(object):
+    """
+    An immutable stack that shares its tail with the stack it was pushed
+    onto, so keeping a reference to it is enough to take a snapshot.
+    Iteration goes from the top of the stack to the bottom.
+    """
+    __slots__ = ('top', 'rest')
+
+    def __init__(self, top=None, rest=None):
+        self.top = top
+        self.rest = rest
+
+    def push(self, item):
+        return LinkedStack(item, self)
+
+    def __iter__(self):
+        node = self
+        while node.rest is not None:
+            yield node.top
+            node = node.rest
+
+    def __bool__(self):
+        return self.rest is not None
+
+    __nonzero__ = __bool__
+
+    def __len__(self):
+        return sum(1 for _ in self)